@@ -0,0 +1,103 @@
+"""
+Admin API endpoints - operational visibility
+"""
+from fastapi import APIRouter, Depends, Query
+from app.database import get_pool_statuses, slow_query_log
+from app.core.dependencies import require_admin
+from app.core.analytics_cache import analytics_cache
+from app.core.cache_bus import cache_bus
+from app.core.profile_cache import ProfileSnapshot, profile_cache
+from app.core.response_cache import family_responses
+from app.core.security import token_cache
+from app.core.statements import statements
+
+router = APIRouter()
+
+
+@router.get("/db/pool")
+async def get_pool_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Connection pool usage: checked-out/overflow counts and checkout wait times"""
+    return {"pools": get_pool_statuses()}
+
+
+@router.get("/db/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: ProfileSnapshot = Depends(require_admin)
+):
+    """Most recent statements over SLOW_QUERY_THRESHOLD_MS, with EXPLAIN plans"""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "slow_queries": slow_query_log.recent(limit)
+    }
+
+
+@router.delete("/db/slow-queries")
+async def clear_slow_queries(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Empty the slow query ring buffer"""
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
+@router.get("/db/statements")
+async def get_statement_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Compiled statement cache hits and misses, per prebuilt statement and overall"""
+    return statements.snapshot()
+
+
+@router.delete("/db/statements")
+async def reset_statement_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Zero the statement cache counters"""
+    statements.reset()
+    return {"message": "Statement cache counters reset"}
+
+
+@router.get("/cache/profiles")
+async def get_profile_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Authenticated-user cache size and hit ratio"""
+    return profile_cache.stats()
+
+
+@router.delete("/cache/profiles")
+async def clear_profile_cache(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Drop every cached profile snapshot"""
+    profile_cache.clear()
+    return {"message": "Profile cache cleared"}
+
+
+@router.get("/cache/tokens")
+async def get_token_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Verified-JWT cache size and hit ratio"""
+    return token_cache.stats()
+
+
+@router.get("/cache/responses")
+async def get_response_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Family-versioned response cache size and hit ratio"""
+    return family_responses.stats()
+
+
+@router.delete("/cache/responses")
+async def clear_response_cache(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Drop every cached family response"""
+    family_responses.clear()
+    return {"message": "Response cache cleared"}
+
+
+@router.get("/cache/analytics")
+async def get_analytics_cache_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Analytics aggregate cache size, hit ratio and completion events applied"""
+    return analytics_cache.stats()
+
+
+@router.delete("/cache/analytics")
+async def clear_analytics_cache(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Drop every cached analytics aggregate"""
+    analytics_cache.clear()
+    return {"message": "Analytics cache cleared"}
+
+
+@router.get("/cache/bus")
+async def get_cache_bus_stats(current_user: ProfileSnapshot = Depends(require_admin)):
+    """Cross-worker invalidation bus transport and message counts"""
+    return cache_bus.stats()
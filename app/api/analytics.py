@@ -2,34 +2,37 @@
 Analytics API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.database import get_db
-from app.core.dependencies import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_current_user, get_read_db, check_etag
+from app.core.profile_cache import ProfileSnapshot
 from app.models.profile import Profile
-from app.models.task_completion import TaskCompletion
+from app.core.analytics_cache import analytics_cache
+from app.core.rollups import completion_series, completion_summary
 from datetime import date, datetime, timedelta
+from itertools import groupby
 from typing import Optional
 
 router = APIRouter()
 
 
-@router.get("/child/{child_id}")
+@router.get("/child/{child_id}", dependencies=[Depends(check_etag)])
 async def get_child_analytics(
     child_id: int,
     period: str = Query("week", regex="^(day|week|month|year|all)$"),
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed analytics for a specific child
     Period options: day, week, month, year, all
     """
     # Verify parent has access to this child
-    child = db.query(Profile).filter(
+    result = await db.execute(select(Profile).filter(
         Profile.id == child_id,
         Profile.family_id == current_user.family_id
-    ).first()
+    ))
+    child = result.scalars().first()
 
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
@@ -52,53 +55,27 @@ async def get_child_analytics(
         start_date = date(2020, 1, 1)  # Far past date
         end_date = today
 
-    # Get all completions in date range
-    completions = db.query(TaskCompletion).filter(
-        TaskCompletion.child_id == child_id,
-        TaskCompletion.completion_date >= start_date,
-        TaskCompletion.completion_date <= end_date
-    ).all()
-
-    # Calculate overall stats
-    total_tasks = len(completions)
-    total_points = sum(c.points_earned for c in completions)
-
-    # Group by period (morning/evening/anytime)
-    by_period = {}
-    for completion in completions:
-        period_key = completion.task_period
-        if period_key not in by_period:
-            by_period[period_key] = {"tasks": 0, "points": 0}
-        by_period[period_key]["tasks"] += 1
-        by_period[period_key]["points"] += completion.points_earned
-
-    # Group by category
-    by_category = {}
-    for completion in completions:
-        category_key = completion.task_category
-        if category_key not in by_category:
-            by_category[category_key] = {"tasks": 0, "points": 0}
-        by_category[category_key]["tasks"] += 1
-        by_category[category_key]["points"] += completion.points_earned
-
-    # Get daily breakdown for charts
-    daily_stats = db.query(
-        TaskCompletion.completion_date,
-        func.count(TaskCompletion.id).label('task_count'),
-        func.sum(TaskCompletion.points_earned).label('points_total')
-    ).filter(
-        TaskCompletion.child_id == child_id,
-        TaskCompletion.completion_date >= start_date,
-        TaskCompletion.completion_date <= end_date
-    ).group_by(TaskCompletion.completion_date).order_by(TaskCompletion.completion_date).all()
+    # Completion aggregates are cached per range and kept current by completion events
+    summary = analytics_cache.get("child", child_id, start_date, end_date)
+    if summary is None:
+        generation = analytics_cache.generation("child", child_id)
+
+        # Daily rollups, plus today's raw completions
+        summary = await completion_summary(
+            db, start_date, end_date, child_id=child_id, breakdowns=("by_period", "by_category", "by_day")
+        )
+        analytics_cache.put("child", child_id, start_date, end_date, summary, generation)
+
+    total_tasks = summary["tasks"]
+    total_points = summary["points"]
 
     daily_breakdown = [
         {
-            "date": str(stat.completion_date),
-            "tasks": stat.task_count,
-            "points": stat.points_total or 0
+            "date": str(day),
+            "tasks": totals["tasks"],
+            "points": totals["points"]
         }
-        for stat in daily_stats
+        for day, totals in sorted(summary["by_day"].items())
     ]
 
     # Calculate averages
@@ -126,18 +103,18 @@ async def get_child_analytics(
             "current_streak": child.current_streak,
             "longest_streak": child.longest_streak
         },
-        "by_period": by_period,
-        "by_category": by_category,
+        "by_period": summary["by_period"],
+        "by_category": summary["by_category"],
         "daily_breakdown": daily_breakdown,
         "best_day": best_day
     }
 
 
-@router.get("/family")
+@router.get("/family", dependencies=[Depends(check_etag)])
 async def get_family_analytics(
     period: str = Query("week", regex="^(day|week|month|year|all)$"),
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get aggregated analytics for entire family
@@ -163,54 +140,28 @@ async def get_family_analytics(
         start_date = date(2020, 1, 1)
         end_date = today
 
-    # Get all family completions
-    completions = db.query(TaskCompletion).filter(
-        TaskCompletion.family_id == current_user.family_id,
-        TaskCompletion.completion_date >= start_date,
-        TaskCompletion.completion_date <= end_date
-    ).all()
-
-    # Overall family stats
-    total_tasks = len(completions)
-    total_points = sum(c.points_earned for c in completions)
-
-    # Group by child
-    by_child = {}
-    for completion in completions:
-        child_id = completion.child_id
-        if child_id not in by_child:
-            child = completion.child
-            by_child[child_id] = {
-                "child_name": f"{child.first_name} {child.last_name}",
-                "tasks": 0,
-                "points": 0
-            }
-        by_child[child_id]["tasks"] += 1
-        by_child[child_id]["points"] += completion.points_earned
-
-    # Group by category
-    by_category = {}
-    for completion in completions:
-        category_key = completion.task_category
-        if category_key not in by_category:
-            by_category[category_key] = {"tasks": 0, "points": 0}
-        by_category[category_key]["tasks"] += 1
-        by_category[category_key]["points"] += completion.points_earned
-
-    # Group by period
-    by_period = {}
-    for completion in completions:
-        period_key = completion.task_period
-        if period_key not in by_period:
-            by_period[period_key] = {"tasks": 0, "points": 0}
-        by_period[period_key]["tasks"] += 1
-        by_period[period_key]["points"] += completion.points_earned
+    # Completion aggregates are cached per range and kept current by completion events
+    summary = analytics_cache.get("family", current_user.family_id, start_date, end_date)
+    if summary is None:
+        generation = analytics_cache.generation("family", current_user.family_id)
+
+        # Daily rollups, plus today's raw completions
+        summary = await completion_summary(
+            db, start_date, end_date, family_id=current_user.family_id,
+            breakdowns=("by_period", "by_category", "by_child")
+        )
+        analytics_cache.put("family", current_user.family_id, start_date, end_date, summary, generation)
+
+    total_tasks = summary["tasks"]
+    total_points = summary["points"]
+    by_child = summary["by_child"]
 
     # Get all children in family
-    children = db.query(Profile).filter(
+    result = await db.execute(select(Profile).filter(
         Profile.family_id == current_user.family_id,
         Profile.role == "child"
-    ).all()
+    ))
+    children = result.scalars().all()
 
     children_summary = [
         {
@@ -241,67 +192,85 @@ async def get_family_analytics(
             "avg_points_per_day": round(total_points / num_days, 2) if num_days > 0 else 0
         },
         "by_child": children_summary,
-        "by_category": by_category,
-        "by_period": by_period
+        "by_category": summary["by_category"],
+        "by_period": summary["by_period"]
     }
 
 
-@router.get("/trends/{child_id}")
-async def get_child_trends(
-    child_id: int,
+@router.get("/trends", dependencies=[Depends(check_etag)])
+async def get_family_trends(
     days: int = Query(30, ge=7, le=365),
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    child_ids: Optional[str] = Query(None, regex=r"^\d+(,\d+)*$"),
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get trend data for charts (last N days)
+    Get trend data for several children at once (last N days)
+    child_ids: comma-separated ids (default: every child in the family)
     """
-    # Verify access
-    child = db.query(Profile).filter(
-        Profile.id == child_id,
-        Profile.family_id == current_user.family_id
-    ).first()
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="No family found")
 
-    if not child:
+    ids = sorted({int(child_id) for child_id in child_ids.split(",")}) if child_ids else None
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days - 1)
+
+    # Zero-filled daily series for every child, from one grouped query
+    rows = await completion_series(db, start_date, end_date, current_user.family_id, child_ids=ids)
+    children = _trends_by_child(rows)
+    if ids is not None and len(children) != len(ids):
         raise HTTPException(status_code=404, detail="Child not found")
 
+    return {
+        "days": days,
+        "children": children
+    }
+
+
+@router.get("/trends/{child_id}", dependencies=[Depends(check_etag)])
+async def get_child_trends(
+    child_id: int,
+    days: int = Query(30, ge=7, le=365),
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get trend data for charts (last N days)
+    """
     end_date = date.today()
     start_date = end_date - timedelta(days=days - 1)
 
-    # Get daily stats
-    daily_stats = db.query(
-        TaskCompletion.completion_date,
-        func.count(TaskCompletion.id).label('task_count'),
-        func.sum(TaskCompletion.points_earned).label('points_total')
-    ).filter(
-        TaskCompletion.child_id == child_id,
-        TaskCompletion.completion_date >= start_date,
-        TaskCompletion.completion_date <= end_date
-    ).group_by(TaskCompletion.completion_date).order_by(TaskCompletion.completion_date).all()
-
-    # Fill in missing days with zeros
-    date_dict = {stat.completion_date: {"tasks": stat.task_count, "points": stat.points_total or 0} for stat in daily_stats}
-
-    trend_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date in date_dict:
-            trend_data.append({
-                "date": str(current_date),
-                "tasks": date_dict[current_date]["tasks"],
-                "points": date_dict[current_date]["points"]
-            })
-        else:
-            trend_data.append({
-                "date": str(current_date),
-                "tasks": 0,
-                "points": 0
-            })
-        current_date += timedelta(days=1)
+    # Only returns rows for a child in the user's family, so this verifies access too
+    rows = await completion_series(db, start_date, end_date, current_user.family_id, child_ids=[child_id])
+    children = _trends_by_child(rows)
+
+    if not children:
+        raise HTTPException(status_code=404, detail="Child not found")
 
     return {
         "child_id": child_id,
-        "child_name": f"{child.first_name} {child.last_name}",
+        "child_name": children[0]["child_name"],
         "days": days,
-        "trend_data": trend_data
+        "trend_data": children[0]["trend_data"]
     }
+
+
+def _trends_by_child(rows) -> list:
+    """completion_series() rows as one {child_id, child_name, trend_data} entry per child"""
+    return [
+        {
+            "child_id": child_id,
+            "child_name": f"{first_name} {last_name}",
+            "trend_data": [
+                {
+                    "date": str(row.date),
+                    "tasks": int(row.tasks),
+                    "points": int(row.points)
+                }
+                for row in child_rows
+            ]
+        }
+        for (child_id, first_name, last_name), child_rows in groupby(
+            rows, key=lambda row: (row.child_id, row.first_name, row.last_name)
+        )
+    ]
@@ -2,27 +2,36 @@
 Approvals API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, contains_eager
 from datetime import datetime
-from app.database import get_db
+from app.database import get_async_db, record_write
+from app.core.response_cache import family_responses
 from app.core.dependencies import get_current_user
-from app.models.profile import Profile
+from app.core.profile_cache import ProfileSnapshot
+from app.core.statements import DAILY_PROGRESS_FOR_DAY
+from app.core.points_ledger import record_points
+from app.core.rollups import record_completion
 from app.models.task_approval import TaskApproval, ApprovalStatus
 from app.models.task import Task
+from app.models.task_completion import TaskCompletion
+from app.models.daily_task_status import DailyTaskStatus, TaskState
+from app.models.points_ledger import LedgerEvent
 
 router = APIRouter()
 
 @router.get("/")
 async def get_approvals(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get pending approval requests"""
     if not current_user or not current_user.family_id:
         return {"approvals": []}
 
     # Query approvals with eager loading of relationships
-    approvals = db.query(TaskApproval).options(
+    result = await db.execute(select(TaskApproval).options(
         joinedload(TaskApproval.task),
         joinedload(TaskApproval.child)
     ).join(
@@ -30,7 +39,8 @@ async def get_approvals(
     ).filter(
         TaskApproval.status == ApprovalStatus.PENDING,
         Task.family_id == current_user.family_id
-    ).all()
+    ))
+    approvals = result.scalars().all()
 
     return {
         "approvals": [
@@ -52,21 +62,24 @@ async def get_approvals(
 @router.post("/{approval_id}/approve")
 async def approve_task(
     approval_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Approve a task completion"""
     from app.models.daily_progress import DailyProgress
-    from sqlalchemy.orm.attributes import flag_modified
 
     if not current_user or not current_user.family_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    approval = db.query(TaskApproval).join(
+    result = await db.execute(select(TaskApproval).join(
         TaskApproval.task
+    ).options(
+        contains_eager(TaskApproval.task),
+        joinedload(TaskApproval.child)
     ).filter(
         TaskApproval.id == approval_id
-    ).first()
+    ))
+    approval = result.scalars().first()
 
     # Verify approval belongs to user's family
     if approval and approval.task and approval.task.family_id != current_user.family_id:
@@ -82,39 +95,67 @@ async def approve_task(
     # Award points to child and update progress
     if approval.child and approval.task:
         approval.child.total_lifetime_points += approval.task.points
+        await record_points(
+            db, approval.child_id, approval.task.points, LedgerEvent.EARN,
+            task_id=approval.task_id, on_date=approval.date_for
+        )
 
         # Get or create daily progress entry
-        progress = db.query(DailyProgress).filter(
-            DailyProgress.child_id == approval.child_id,
-            DailyProgress.date == approval.date_for
-        ).first()
+        result = await db.execute(DAILY_PROGRESS_FOR_DAY, {
+            "child_id": approval.child_id,
+            "date": approval.date_for
+        })
+        progress = result.scalars().first()
 
         if not progress:
             progress = DailyProgress(
                 child_id=approval.child_id,
                 date=approval.date_for,
-                total_points=0,
-                completed_task_ids=[],
-                pending_approval_ids=[],
-                redeemed_reward_ids=[]
+                total_points=0
             )
             db.add(progress)
 
         # Move from pending to completed
-        if progress.pending_approval_ids is None:
-            progress.pending_approval_ids = []
-        if approval.task_id in progress.pending_approval_ids:
-            progress.pending_approval_ids.remove(approval.task_id)
-            flag_modified(progress, 'pending_approval_ids')
-
-        if progress.completed_task_ids is None:
-            progress.completed_task_ids = []
-        if approval.task_id not in progress.completed_task_ids:
-            progress.completed_task_ids.append(approval.task_id)
+        result = await db.execute(select(DailyTaskStatus).filter(
+            DailyTaskStatus.child_id == approval.child_id,
+            DailyTaskStatus.date == approval.date_for,
+            DailyTaskStatus.task_id == approval.task_id
+        ))
+        task_status = result.scalars().first()
+
+        if not task_status:
+            task_status = DailyTaskStatus(
+                child_id=approval.child_id,
+                date=approval.date_for,
+                task_id=approval.task_id,
+                state=TaskState.PENDING_APPROVAL
+            )
+            db.add(task_status)
+
+        if task_status.state != TaskState.COMPLETED:
+            task_status.state = TaskState.COMPLETED
             progress.total_points += approval.task.points
-            flag_modified(progress, 'completed_task_ids')
 
-    db.commit()
+            # Record detailed completion for analytics
+            task = approval.task
+            completion_record = TaskCompletion(
+                child_id=approval.child_id,
+                task_id=task.id,
+                family_id=approval.child.family_id,
+                task_title=task.title,
+                task_category=task.category.value if hasattr(task.category, 'value') else str(task.category),
+                task_period=task.period.value if hasattr(task.period, 'value') else str(task.period),
+                points_earned=task.points,
+                completion_date=approval.date_for,
+                completed_at=approval.approved_at,
+                required_approval=1
+            )
+            db.add(completion_record)
+            await record_completion(db, completion_record)
+
+    await db.commit()
+    record_write(current_user.family_id)
+    family_responses.bump(current_user.family_id)
 
     return {"message": "Task approved!"}
 
@@ -122,21 +163,23 @@ async def approve_task(
 @router.post("/{approval_id}/deny")
 async def deny_task(
     approval_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deny a task completion"""
-    from app.models.daily_progress import DailyProgress
-    from sqlalchemy.orm.attributes import flag_modified
 
     if not current_user or not current_user.family_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    approval = db.query(TaskApproval).join(
+    result = await db.execute(select(TaskApproval).join(
         TaskApproval.task
+    ).options(
+        contains_eager(TaskApproval.task),
+        joinedload(TaskApproval.child)
     ).filter(
         TaskApproval.id == approval_id
-    ).first()
+    ))
+    approval = result.scalars().first()
 
     # Verify approval belongs to user's family
     if approval and approval.task and approval.task.family_id != current_user.family_id:
@@ -149,18 +192,17 @@ async def deny_task(
     approval.approved_by = current_user.id
     approval.approved_at = datetime.utcnow()
 
-    # Remove from pending approvals list so child can retry
+    # Clear the pending status so child can retry
     if approval.child_id and approval.task_id:
-        progress = db.query(DailyProgress).filter(
-            DailyProgress.child_id == approval.child_id,
-            DailyProgress.date == approval.date_for
-        ).first()
-
-        if progress and progress.pending_approval_ids:
-            if approval.task_id in progress.pending_approval_ids:
-                progress.pending_approval_ids.remove(approval.task_id)
-                flag_modified(progress, 'pending_approval_ids')
-
-    db.commit()
+        await db.execute(delete(DailyTaskStatus).filter(
+            DailyTaskStatus.child_id == approval.child_id,
+            DailyTaskStatus.date == approval.date_for,
+            DailyTaskStatus.task_id == approval.task_id,
+            DailyTaskStatus.state == TaskState.PENDING_APPROVAL
+        ))
+
+    await db.commit()
+    record_write(current_user.family_id)
+    family_responses.bump(current_user.family_id)
 
     return {"message": "Task denied"}
\ No newline at end of file
@@ -2,14 +2,18 @@
 Authentication API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.database import get_db
+from app.database import get_async_db, record_write
 from app.models.profile import Profile
 from app.models.family import Family
 from app.schemas.auth import UserLogin, UserRegister, TokenResponse, UserResponse
 from app.core.security import verify_password, get_password_hash, create_access_token
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_read_db
+from app.core.profile_cache import ProfileSnapshot, live_profile
+from app.core.response_cache import family_responses
+from app.core.statements import DAILY_PROGRESS_FOR_DAY
 import hashlib
 
 router = APIRouter()
@@ -19,14 +23,15 @@ router = APIRouter()
 async def register(
     user_data: UserRegister,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new user"""
     import string
     import random
 
     # Check if email already exists
-    existing_user = db.query(Profile).filter(Profile.email == user_data.email).first()
+    result = await db.execute(select(Profile).filter(Profile.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,7 +41,8 @@ async def register(
     # Verify family if joining existing family
     family_id = None
     if user_data.join_code:
-        family = db.query(Family).filter(Family.join_code == user_data.join_code).first()
+        result = await db.execute(select(Family).filter(Family.join_code == user_data.join_code))
+        family = result.scalars().first()
         if not family:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -50,7 +56,8 @@ async def register(
         # Generate unique join code
         while True:
             join_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            existing_family = db.query(Family).filter(Family.join_code == join_code).first()
+            result = await db.execute(select(Family).filter(Family.join_code == join_code))
+            existing_family = result.scalars().first()
             if not existing_family:
                 break
 
@@ -60,7 +67,7 @@ async def register(
             join_code=join_code
         )
         db.add(new_family)
-        db.flush()  # Get the family ID
+        await db.flush()  # Get the family ID
         family_id = new_family.id
 
     # Parse name into first and last name
@@ -80,8 +87,10 @@ async def register(
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    record_write(new_user.family_id)
+    family_responses.bump(new_user.family_id)
+    await db.refresh(new_user)
 
     # Create access token
     access_token = create_access_token(data={"sub": new_user.id})
@@ -115,11 +124,12 @@ async def register(
 async def login(
     credentials: UserLogin,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login user"""
     # Find user by email
-    user = db.query(Profile).filter(Profile.email == credentials.email).first()
+    result = await db.execute(select(Profile).filter(Profile.email == credentials.email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -136,7 +146,8 @@ async def login(
 
     # Update last login timestamp
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    record_write(user.family_id)
 
     # Create access token
     access_token = create_access_token(data={"sub": user.id})
@@ -174,7 +185,7 @@ async def logout(response: Response):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: Profile = Depends(get_current_user)):
+async def get_me(current_user: ProfileSnapshot = Depends(get_current_user)):
     """Get current user info"""
     if not current_user:
         raise HTTPException(
@@ -201,46 +212,54 @@ async def get_me(current_user: Profile = Depends(get_current_user)):
 @router.put("/theme")
 async def update_theme(
     theme_data: dict,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user's theme, avatar, and theme settings"""
+    profile = await live_profile(db, current_user)
     if "theme" in theme_data:
-        current_user.theme = theme_data["theme"]
+        profile.theme = theme_data["theme"]
     if "avatar" in theme_data:
-        current_user.avatar = theme_data["avatar"]
+        profile.avatar = theme_data["avatar"]
     if "theme_enabled" in theme_data:
-        current_user.theme_enabled = theme_data["theme_enabled"]
+        profile.theme_enabled = theme_data["theme_enabled"]
     if "custom_colors" in theme_data:
-        current_user.custom_colors = theme_data["custom_colors"]
+        profile.custom_colors = theme_data["custom_colors"]
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    record_write(profile.family_id)
+    await db.refresh(profile)
 
     return {
         "success": True,
-        "theme": current_user.theme,
-        "avatar": current_user.avatar,
-        "theme_enabled": current_user.theme_enabled,
-        "custom_colors": current_user.custom_colors
+        "theme": profile.theme,
+        "avatar": profile.avatar,
+        "theme_enabled": profile.theme_enabled,
+        "custom_colors": profile.custom_colors
     }
 
 
 @router.get("/children")
 async def get_children(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all children in current user's family"""
     if not current_user or not current_user.family_id:
         return {"children": []}
 
-    children = db.query(Profile).filter(
+    cached = family_responses.get(current_user.family_id, "children", current_user.role)
+    if cached is not None:
+        return cached
+    version = family_responses.version(current_user.family_id)
+
+    result = await db.execute(select(Profile).filter(
         Profile.family_id == current_user.family_id,
         Profile.role == "child"
-    ).all()
+    ))
+    children = result.scalars().all()
 
-    return {
+    payload = {
         "children": [
             {
                 "id": child.id,
@@ -252,66 +271,73 @@ async def get_children(
             for child in children
         ]
     }
+    return family_responses.put(current_user.family_id, "children", current_user.role, payload, version)
 
 
 @router.get("/children/stats")
 async def get_children_stats(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get detailed stats for all children in family"""
     from app.models.daily_progress import DailyProgress
+    from app.models.daily_task_status import DailyTaskStatus, TaskState
+    from app.models.reward_redemption import RewardRedemption
     from app.models.task_assignment import TaskAssignment
-    from app.models.task_approval import TaskApproval, ApprovalStatus
     from datetime import date
-    from sqlalchemy import func
 
     if not current_user or not current_user.family_id:
         return {"children_stats": []}
 
-    children = db.query(Profile).filter(
+    result = await db.execute(select(Profile).filter(
         Profile.family_id == current_user.family_id,
         Profile.role == "child"
-    ).all()
+    ))
+    children = result.scalars().all()
 
     today = date.today()
     children_stats = []
 
     for child in children:
         # Get today's progress
-        today_progress = db.query(DailyProgress).filter(
-            DailyProgress.child_id == child.id,
-            DailyProgress.date == today
-        ).first()
+        result = await db.execute(DAILY_PROGRESS_FOR_DAY, {
+            "child_id": child.id,
+            "date": today
+        })
+        today_progress = result.scalars().first()
+
+        # Count today's completed and pending tasks
+        result = await db.execute(select(
+            DailyTaskStatus.state,
+            func.count(DailyTaskStatus.id)
+        ).filter(
+            DailyTaskStatus.child_id == child.id,
+            DailyTaskStatus.date == today
+        ).group_by(DailyTaskStatus.state))
+        today_counts = dict(result.all())
 
         # Calculate stats
-        tasks_completed_today = len(today_progress.completed_task_ids) if today_progress and today_progress.completed_task_ids else 0
+        tasks_completed_today = today_counts.get(TaskState.COMPLETED, 0)
         points_earned_today = today_progress.total_points if today_progress else 0
-        pending_approvals_count = len(today_progress.pending_approval_ids) if today_progress and today_progress.pending_approval_ids else 0
-
-        # Get total rewards claimed (count all redeemed rewards across all days)
-        # Fetch all daily progress records with redeemed rewards
-        all_progress = db.query(DailyProgress).filter(
-            DailyProgress.child_id == child.id,
-            DailyProgress.redeemed_reward_ids.isnot(None)
-        ).all()
-
-        # Count unique rewards across all days
-        all_rewards = set()
-        for progress in all_progress:
-            if progress.redeemed_reward_ids:
-                all_rewards.update(progress.redeemed_reward_ids)
-        total_rewards_claimed = len(all_rewards)
+        pending_approvals_count = today_counts.get(TaskState.PENDING_APPROVAL, 0)
+
+        # Get total rewards claimed (unique rewards redeemed across all days)
+        total_rewards_claimed = await db.scalar(select(
+            func.count(func.distinct(RewardRedemption.reward_id))
+        ).filter(
+            RewardRedemption.child_id == child.id
+        ))
 
         # Get tasks assigned to this child
-        assigned_tasks_count = db.query(TaskAssignment).filter(
+        assigned_tasks_count = await db.scalar(select(func.count(TaskAssignment.id)).filter(
             TaskAssignment.child_id == child.id
-        ).count()
+        ))
 
         # Get last activity date (most recent daily progress entry)
-        last_activity = db.query(DailyProgress).filter(
+        result = await db.execute(select(DailyProgress).filter(
             DailyProgress.child_id == child.id
-        ).order_by(DailyProgress.date.desc()).first()
+        ).order_by(DailyProgress.date.desc()).limit(1))
+        last_activity = result.scalars().first()
 
         last_activity_date = last_activity.date.isoformat() if last_activity else None
 
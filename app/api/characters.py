@@ -6,15 +6,16 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Dict
 from app.database import get_db
-from app.models.profile import Profile
 from app.models.character_unlock import CharacterUnlock
-from app.models.task_completion import TaskCompletion
+from app.core.archive import archived_task_count
+from app.core.partitions import completions_source_sync
 from app.core.dependencies import get_current_user
+from app.core.profile_cache import ProfileSnapshot
 
 router = APIRouter()
 
 
-def check_unlock_requirement(requirement: str, profile: Profile, db: Session) -> bool:
+def check_unlock_requirement(requirement: str, profile: ProfileSnapshot, db: Session) -> bool:
     """
     Check if a profile meets an unlock requirement
 
@@ -46,9 +47,12 @@ def check_unlock_requirement(requirement: str, profile: Profile, db: Session) ->
 
     # Check task completion requirements
     elif req_type == 'tasks':
-        total_tasks = db.query(TaskCompletion).filter(
-            TaskCompletion.child_id == profile.id
+        completions_table = completions_source_sync(db)
+        total_tasks = db.query(completions_table).filter(
+            completions_table.child_id == profile.id
         ).count()
+        if total_tasks < req_value:
+            total_tasks += archived_task_count(profile.family_id, profile.id)
         return total_tasks >= req_value
 
     # Check kindness acts (tasks with 'kindness' in description or title)
@@ -56,12 +60,19 @@ def check_unlock_requirement(requirement: str, profile: Profile, db: Session) ->
         from app.models.task import Task
         from app.models.task_assignment import TaskAssignment
 
-        kindness_tasks = db.query(TaskCompletion).join(
-            Task, TaskCompletion.task_id == Task.id
+        completions_table = completions_source_sync(db)
+        kindness_tasks = db.query(completions_table).join(
+            Task, completions_table.task_id == Task.id
         ).filter(
-            TaskCompletion.child_id == profile.id,
+            completions_table.child_id == profile.id,
             (Task.title.ilike('%kindness%') | Task.description.ilike('%kindness%'))
         ).count()
+        if kindness_tasks < req_value:
+            kindness_task_ids = {task_id for (task_id,) in db.query(Task.id).filter(
+                Task.family_id == profile.family_id,
+                (Task.title.ilike('%kindness%') | Task.description.ilike('%kindness%'))
+            )}
+            kindness_tasks += archived_task_count(profile.family_id, profile.id, kindness_task_ids)
         return kindness_tasks >= req_value
 
     return False
@@ -69,7 +80,7 @@ def check_unlock_requirement(requirement: str, profile: Profile, db: Session) ->
 
 @router.get("/available")
 async def get_available_characters(
-    current_user: Profile = Depends(get_current_user),
+    current_user: ProfileSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -105,7 +116,7 @@ async def get_available_characters(
 @router.post("/check-unlocks")
 async def check_and_unlock_characters(
     theme_characters: Dict,
-    current_user: Profile = Depends(get_current_user),
+    current_user: ProfileSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -178,7 +189,7 @@ async def check_and_unlock_characters(
 
 @router.get("/unlocked")
 async def get_unlocked_characters(
-    current_user: Profile = Depends(get_current_user),
+    current_user: ProfileSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -209,7 +220,7 @@ async def get_unlocked_characters(
 
 @router.post("/initialize-defaults")
 async def initialize_default_characters(
-    current_user: Profile = Depends(get_current_user),
+    current_user: ProfileSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -3,24 +3,30 @@
 Families API endpoints
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.dependencies import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.core.dependencies import get_current_user, get_read_db, check_etag
+from app.core.profile_cache import ProfileSnapshot
+from app.core.response_cache import family_responses
 from app.models.profile import Profile
+from app.models.family import Family
 
 router = APIRouter()
 
-@router.get("/my-family")
-@router.get("/mine")
+@router.get("/my-family", dependencies=[Depends(check_etag)])
+@router.get("/mine", dependencies=[Depends(check_etag)])
 async def get_my_family(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's family"""
-    if not current_user or not current_user.family:
+    if not current_user or not current_user.family_id:
         return {"family": None, "join_code": None}
 
-    family = current_user.family
+    family = await db.get(Family, current_user.family_id)
+    if not family:
+        return {"family": None, "join_code": None}
 
     return {
         "id": family.id,
@@ -29,22 +35,26 @@ async def get_my_family(
     }
 
 
-@router.get("/members")
+@router.get("/members", dependencies=[Depends(check_etag)])
 async def get_family_members(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all members of the current user's family with their last login"""
     if not current_user or not current_user.family_id:
         return {"members": []}
 
-    # Get all family members
-    members = db.query(Profile).filter(
-        Profile.family_id == current_user.family_id
-    ).order_by(Profile.role.desc(), Profile.first_name).all()
+    # Shared by the whole family; is_current_user is added per request
+    members = family_responses.get(current_user.family_id, "members", "any")
+    if members is None:
+        version = family_responses.version(current_user.family_id)
 
-    return {
-        "members": [
+        # Get all family members
+        result = await db.execute(select(Profile).filter(
+            Profile.family_id == current_user.family_id
+        ).order_by(Profile.role.desc(), Profile.first_name))
+
+        members = family_responses.put(current_user.family_id, "members", "any", [
             {
                 "id": member.id,
                 "first_name": member.first_name,
@@ -53,9 +63,14 @@ async def get_family_members(
                 "role": member.role,
                 "theme": member.theme if member.theme else "default",
                 "total_lifetime_points": member.total_lifetime_points,
-                "last_login": member.last_login.isoformat() if member.last_login else None,
-                "is_current_user": member.id == current_user.id
+                "last_login": member.last_login.isoformat() if member.last_login else None
             }
+            for member in result.scalars().all()
+        ], version)
+
+    return {
+        "members": [
+            {**member, "is_current_user": member["id"] == current_user.id}
             for member in members
         ]
     }
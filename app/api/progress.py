@@ -3,22 +3,23 @@
 Progress API endpoints
 """
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
-from app.core.dependencies import get_current_user
-from app.models.profile import Profile
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_current_user, get_read_db, check_etag
+from app.core.profile_cache import ProfileSnapshot
+from app.core.points_ledger import balance_history
 from app.models.daily_progress import DailyProgress
+from app.models.daily_task_status import DailyTaskStatus, TaskState
 from datetime import date, datetime, timedelta
 
 router = APIRouter()
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[Depends(check_etag)])
 async def get_progress_stats(
     period: str = Query("today", regex="^(today|week|month|year|all)$"),
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get progress statistics for different time periods"""
 
@@ -46,22 +47,29 @@ async def get_progress_stats(
         end_date = today.replace(month=12, day=31)
     else:  # "all"
         # All time - get earliest record
-        earliest = db.query(func.min(DailyProgress.date)).filter(
+        earliest = await db.scalar(select(func.min(DailyProgress.date)).filter(
             DailyProgress.child_id == current_user.id
-        ).scalar()
+        ))
         start_date = earliest if earliest else today
         end_date = today
 
     # Query progress records in date range
-    progress_records = db.query(DailyProgress).filter(
+    result = await db.execute(select(DailyProgress).filter(
         DailyProgress.child_id == current_user.id,
         DailyProgress.date >= start_date,
         DailyProgress.date <= end_date
-    ).all()
+    ))
+    progress_records = result.scalars().all()
+
+    total_completed = await db.scalar(select(func.count(DailyTaskStatus.id)).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date >= start_date,
+        DailyTaskStatus.date <= end_date,
+        DailyTaskStatus.state == TaskState.COMPLETED
+    ))
 
     # Calculate statistics
     total_points = sum(p.total_points or 0 for p in progress_records)
-    total_completed = sum(len(p.completed_task_ids or []) for p in progress_records)
     days_active = len(progress_records)
 
     # Calculate average daily points (only for active days)
@@ -87,9 +95,13 @@ async def get_progress_stats(
             break
 
     # Get today's completed and pending tasks for display
-    today_progress = next((p for p in progress_records if p.date == today), None)
-    completed_task_ids = today_progress.completed_task_ids if today_progress else []
-    pending_approval_ids = today_progress.pending_approval_ids if today_progress else []
+    result = await db.execute(select(DailyTaskStatus.task_id, DailyTaskStatus.state).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date == today
+    ).order_by(DailyTaskStatus.id))
+    today_statuses = result.all()
+    completed_task_ids = [row.task_id for row in today_statuses if row.state == TaskState.COMPLETED]
+    pending_approval_ids = [row.task_id for row in today_statuses if row.state == TaskState.PENDING_APPROVAL]
 
     return {
         "period": period,
@@ -107,22 +119,34 @@ async def get_progress_stats(
     }
 
 
-@router.get("/history")
+@router.get("/history", dependencies=[Depends(check_etag)])
 async def get_progress_history(
     days: int = Query(7, ge=1, le=365),
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get daily progress history for charts"""
 
     end_date = date.today()
     start_date = end_date - timedelta(days=days - 1)
 
-    progress_records = db.query(DailyProgress).filter(
+    result = await db.execute(select(DailyProgress).filter(
         DailyProgress.child_id == current_user.id,
         DailyProgress.date >= start_date,
         DailyProgress.date <= end_date
-    ).order_by(DailyProgress.date).all()
+    ).order_by(DailyProgress.date))
+    progress_records = result.scalars().all()
+
+    result = await db.execute(select(
+        DailyTaskStatus.date,
+        func.count(DailyTaskStatus.id).label('task_count')
+    ).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date >= start_date,
+        DailyTaskStatus.date <= end_date,
+        DailyTaskStatus.state == TaskState.COMPLETED
+    ).group_by(DailyTaskStatus.date))
+    completed_by_date = {row.date: row.task_count for row in result.all()}
 
     # Create a complete date range
     history = []
@@ -132,8 +156,24 @@ async def get_progress_history(
         history.append({
             "date": current_date.isoformat(),
             "points": progress.total_points if progress else 0,
-            "tasks_completed": len(progress.completed_task_ids) if progress and progress.completed_task_ids else 0
+            "tasks_completed": completed_by_date.get(current_date, 0)
         })
         current_date += timedelta(days=1)
 
     return {"history": history}
+
+
+@router.get("/balance-history", dependencies=[Depends(check_etag)])
+async def get_balance_history(
+    days: int = Query(30, ge=1, le=365),
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get daily points balance from the points ledger"""
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days - 1)
+
+    history = await balance_history(db, current_user.id, start_date, end_date)
+
+    return {"balance_history": history}
@@ -2,28 +2,40 @@
 Rewards API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.dependencies import get_current_user
-from app.models.profile import Profile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, record_write
+from app.core.dependencies import get_current_user, check_etag
+from app.core.statements import DAILY_PROGRESS_FOR_DAY
+from app.core.points_ledger import record_points
+from app.core.profile_cache import ProfileSnapshot, live_profile
+from app.core.response_cache import family_responses
 from app.models.reward import Reward, RewardType
+from app.models.reward_redemption import RewardRedemption
+from app.models.points_ledger import LedgerEvent
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(check_etag)])
 async def get_rewards(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get available rewards"""
     if not current_user or not current_user.family_id:
         return {"rewards": []}
 
-    rewards = db.query(Reward).filter(
+    cached = family_responses.get(current_user.family_id, "rewards", current_user.role)
+    if cached is not None:
+        return cached
+    version = family_responses.version(current_user.family_id)
+
+    result = await db.execute(select(Reward).filter(
         Reward.family_id == current_user.family_id
-    ).all()
+    ))
+    rewards = result.scalars().all()
 
-    return {
+    payload = {
         "rewards": [
             {
                 "id": r.id,
@@ -36,13 +48,14 @@ async def get_rewards(
             for r in rewards
         ]
     }
+    return family_responses.put(current_user.family_id, "rewards", current_user.role, payload, version)
 
 
 @router.post("/")
 async def create_reward(
     reward_data: dict,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new reward (parent only)"""
     if current_user.role != "parent":
@@ -62,8 +75,9 @@ async def create_reward(
     )
 
     db.add(new_reward)
-    db.commit()
-    db.refresh(new_reward)
+    await db.commit()
+    family_responses.bump(current_user.family_id)
+    await db.refresh(new_reward)
 
     return {
         "id": new_reward.id,
@@ -76,18 +90,19 @@ async def create_reward(
 async def update_reward(
     reward_id: int,
     reward_data: dict,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a reward (parent only)"""
     if current_user.role != "parent":
         raise HTTPException(status_code=403, detail="Only parents can update rewards")
 
     # Verify reward exists and belongs to family
-    reward = db.query(Reward).filter(
+    result = await db.execute(select(Reward).filter(
         Reward.id == reward_id,
         Reward.family_id == current_user.family_id
-    ).first()
+    ))
+    reward = result.scalars().first()
 
     if not reward:
         raise HTTPException(status_code=404, detail="Reward not found")
@@ -102,32 +117,35 @@ async def update_reward(
     if "type" in reward_data:
         reward.type = RewardType(reward_data["type"])
 
-    db.commit()
+    await db.commit()
+    family_responses.bump(current_user.family_id)
     return {"message": "Reward updated successfully!"}
 
 
 @router.delete("/{reward_id}")
 async def delete_reward(
     reward_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a reward (parent only)"""
     if current_user.role != "parent":
         raise HTTPException(status_code=403, detail="Only parents can delete rewards")
 
     # Verify reward exists and belongs to family
-    reward = db.query(Reward).filter(
+    result = await db.execute(select(Reward).filter(
         Reward.id == reward_id,
         Reward.family_id == current_user.family_id
-    ).first()
+    ))
+    reward = result.scalars().first()
 
     if not reward:
         raise HTTPException(status_code=404, detail="Reward not found")
 
     # Delete the reward
-    db.delete(reward)
-    db.commit()
+    await db.delete(reward)
+    await db.commit()
+    family_responses.bump(current_user.family_id)
 
     return {"message": "Reward deleted successfully!"}
 
@@ -135,96 +153,94 @@ async def delete_reward(
 @router.post("/{reward_id}/redeem")
 async def redeem_reward(
     reward_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Redeem a reward with points"""
     from app.models.daily_progress import DailyProgress
     from datetime import date
-    from sqlalchemy.orm.attributes import flag_modified
 
     # Verify reward exists and belongs to family
-    reward = db.query(Reward).filter(
+    result = await db.execute(select(Reward).filter(
         Reward.id == reward_id,
         Reward.family_id == current_user.family_id,
         Reward.is_active == 1
-    ).first()
+    ))
+    reward = result.scalars().first()
 
     if not reward:
         raise HTTPException(status_code=404, detail="Reward not found")
 
-    # Check if user has enough points
-    if current_user.total_lifetime_points < reward.cost:
+    # Check if user has enough points (against the row, not the cached snapshot)
+    profile = await live_profile(db, current_user)
+    if profile.total_lifetime_points < reward.cost:
         raise HTTPException(
             status_code=400,
-            detail=f"Not enough points! You need {reward.cost} points but only have {current_user.total_lifetime_points}."
+            detail=f"Not enough points! You need {reward.cost} points but only have {profile.total_lifetime_points}."
         )
 
     # Get or create today's progress record
     today = date.today()
-    progress = db.query(DailyProgress).filter(
-        DailyProgress.child_id == current_user.id,
-        DailyProgress.date == today
-    ).first()
+    result = await db.execute(DAILY_PROGRESS_FOR_DAY, {
+        "child_id": profile.id,
+        "date": today
+    })
+    progress = result.scalars().first()
 
     if not progress:
         progress = DailyProgress(
-            child_id=current_user.id,
+            child_id=profile.id,
             date=today,
-            total_points=0,
-            completed_task_ids=[],
-            pending_approval_ids=[],
-            redeemed_reward_ids=[]
+            total_points=0
         )
         db.add(progress)
 
-    # Add reward to redeemed list
-    if progress.redeemed_reward_ids is None:
-        progress.redeemed_reward_ids = []
-
-    progress.redeemed_reward_ids.append(reward_id)
-    flag_modified(progress, 'redeemed_reward_ids')
+    # Record the redemption
+    db.add(RewardRedemption(
+        child_id=profile.id,
+        reward_id=reward_id,
+        date=today,
+        points_spent=reward.cost
+    ))
 
     # Deduct points from user's total
-    current_user.total_lifetime_points -= reward.cost
+    profile.total_lifetime_points -= reward.cost
+    await record_points(db, profile.id, -reward.cost, LedgerEvent.SPEND, reward_id=reward_id)
 
-    db.commit()
+    await db.commit()
+    record_write(profile.family_id)
+    family_responses.bump(profile.family_id)
 
     return {
         "message": f"Congratulations! You redeemed {reward.name}!",
         "reward_name": reward.name,
         "points_spent": reward.cost,
-        "remaining_points": current_user.total_lifetime_points
+        "remaining_points": profile.total_lifetime_points
     }
 
 
-@router.get("/redeemed")
+@router.get("/redeemed", dependencies=[Depends(check_etag)])
 async def get_redeemed_rewards(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get history of redeemed rewards for current user"""
-    from app.models.daily_progress import DailyProgress
-
-    # Get all progress records with redeemed rewards
-    progress_records = db.query(DailyProgress).filter(
-        DailyProgress.child_id == current_user.id,
-        DailyProgress.redeemed_reward_ids.isnot(None)
-    ).order_by(DailyProgress.date.desc()).all()
-
-    # Build list of redeemed rewards with dates
-    redeemed_list = []
-    for progress in progress_records:
-        if progress.redeemed_reward_ids:
-            for reward_id in progress.redeemed_reward_ids:
-                reward = db.query(Reward).filter(Reward.id == reward_id).first()
-                if reward:
-                    redeemed_list.append({
-                        "id": reward.id,
-                        "name": reward.name,
-                        "cost": reward.cost,
-                        "icon": reward.icon,
-                        "redeemed_date": progress.date.isoformat()
-                    })
+    # One joined query instead of a Reward lookup per redemption
+    result = await db.execute(select(RewardRedemption.date, Reward).join(
+        Reward, RewardRedemption.reward_id == Reward.id
+    ).filter(
+        RewardRedemption.child_id == current_user.id
+    ).order_by(RewardRedemption.date.desc(), RewardRedemption.id))
+
+    redeemed_list = [
+        {
+            "id": reward.id,
+            "name": reward.name,
+            "cost": reward.cost,
+            "icon": reward.icon,
+            "redeemed_date": redeemed_date.isoformat()
+        }
+        for redeemed_date, reward in result.all()
+    ]
 
     return {"redeemed_rewards": redeemed_list}
\ No newline at end of file
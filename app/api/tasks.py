@@ -2,36 +2,48 @@
 Tasks API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.dependencies import get_current_user
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, record_write
+from app.core.dependencies import get_current_user, check_etag
+from app.core.statements import DAILY_PROGRESS_FOR_DAY, FAMILY_TASK
+from app.core.points_ledger import record_points
+from app.core.rollups import record_completion
+from app.core.profile_cache import ProfileSnapshot, live_profile
+from app.core.response_cache import family_responses
 from app.models.profile import Profile
 from app.models.task import Task
 from app.models.task_assignment import TaskAssignment
 from app.models.daily_progress import DailyProgress
+from app.models.daily_task_status import DailyTaskStatus, TaskState
+from app.models.points_ledger import LedgerEvent
 from datetime import date, timedelta
 
 router = APIRouter()
 
 
-def update_streak(user: Profile, db: Session):
+async def update_streak(user: Profile, db: AsyncSession):
     """Update user's streak when they complete tasks"""
     today = date.today()
     yesterday = today - timedelta(days=1)
 
-    # Check if there's activity yesterday
-    yesterday_progress = db.query(DailyProgress).filter(
-        DailyProgress.child_id == user.id,
-        DailyProgress.date == yesterday
-    ).first()
+    # Check if any task was completed yesterday
+    result = await db.execute(select(DailyTaskStatus.id).filter(
+        DailyTaskStatus.child_id == user.id,
+        DailyTaskStatus.date == yesterday,
+        DailyTaskStatus.state == TaskState.COMPLETED
+    ).limit(1))
+    completed_yesterday = result.first() is not None
 
     # Check if there's activity for any day before today
-    last_activity = db.query(DailyProgress).filter(
+    result = await db.execute(select(DailyProgress).filter(
         DailyProgress.child_id == user.id,
         DailyProgress.date < today
-    ).order_by(DailyProgress.date.desc()).first()
+    ).order_by(DailyProgress.date.desc()).limit(1))
+    last_activity = result.scalars().first()
 
-    if yesterday_progress and len(yesterday_progress.completed_task_ids or []) > 0:
+    if completed_yesterday:
         # Consecutive day - increment streak
         user.current_streak += 1
         if user.current_streak > user.longest_streak:
@@ -50,11 +62,20 @@ def update_streak(user: Profile, db: Session):
     return user.current_streak
 
 
-@router.get("/")
-@router.get("/my-tasks")
+async def commit_task_status(db: AsyncSession):
+    """Commit, turning a concurrent duplicate (child, date, task) status into a 400"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Task already completed or pending today")
+
+
+@router.get("/", dependencies=[Depends(check_etag)])
+@router.get("/my-tasks", dependencies=[Depends(check_etag)])
 async def get_my_tasks(
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get tasks assigned to current child"""
     import logging
@@ -66,24 +87,37 @@ async def get_my_tasks(
     if not current_user or not current_user.family_id:
         logger.warning("No current user or family_id, returning empty tasks")
         return {"tasks": []}
-    
+
+    # Children see their own assignments; parents share one family-wide listing
+    cache_user_id = current_user.id if current_user.role == "child" else None
+    cached = family_responses.get(current_user.family_id, "tasks", current_user.role, cache_user_id)
+    if cached is not None:
+        return cached
+    version = family_responses.version(current_user.family_id)
+
     # If child, return only assigned tasks
     if current_user.role == "child":
         logger.info(f"Child user detected, fetching task assignments for child_id={current_user.id}")
-        assignments = db.query(TaskAssignment).filter(
+        result = await db.execute(select(TaskAssignment).filter(
             TaskAssignment.child_id == current_user.id
-        ).all()
+        ))
+        assignments = result.scalars().all()
         logger.info(f"Found {len(assignments)} task assignments")
 
         task_ids = [a.task_id for a in assignments]
         logger.info(f"Task IDs: {task_ids}")
-        tasks = db.query(Task).filter(Task.id.in_(task_ids)).all() if task_ids else []
+        if task_ids:
+            result = await db.execute(select(Task).filter(Task.id.in_(task_ids)))
+            tasks = result.scalars().all()
+        else:
+            tasks = []
         logger.info(f"Found {len(tasks)} tasks")
     else:
         # If parent, return all family tasks
-        tasks = db.query(Task).filter(Task.family_id == current_user.family_id).all()
+        result = await db.execute(select(Task).filter(Task.family_id == current_user.family_id))
+        tasks = result.scalars().all()
     
-    return {
+    payload = {
         "tasks": [
             {
                 "id": task.id,
@@ -99,13 +133,14 @@ async def get_my_tasks(
             for task in tasks
         ]
     }
+    return family_responses.put(current_user.family_id, "tasks", current_user.role, payload, version, cache_user_id)
 
 
 @router.post("/")
 async def create_task(
     task_data: dict,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new task (parent only)"""
     if current_user.role != "parent":
@@ -132,8 +167,8 @@ async def create_task(
     )
 
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
 
     # Optionally assign to specific children
     assigned_child_ids = task_data.get("assigned_to", [])
@@ -144,7 +179,9 @@ async def create_task(
                 child_id=child_id
             )
             db.add(assignment)
-        db.commit()
+        await db.commit()
+    record_write(current_user.family_id)
+    family_responses.bump(current_user.family_id)
 
     return {
         "id": new_task.id,
@@ -156,53 +193,59 @@ async def create_task(
 @router.post("/{task_id}/complete")
 async def complete_task(
     task_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a task as complete"""
     from app.models.task_approval import TaskApproval, ApprovalStatus
-    from sqlalchemy.orm.attributes import flag_modified
 
     # Verify task exists and belongs to family
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.family_id == current_user.family_id
-    ).first()
+    result = await db.execute(FAMILY_TASK, {
+        "task_id": task_id,
+        "family_id": current_user.family_id
+    })
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Get or create today's progress record
     today = date.today()
-    progress = db.query(DailyProgress).filter(
-        DailyProgress.child_id == current_user.id,
-        DailyProgress.date == today
-    ).first()
+    result = await db.execute(DAILY_PROGRESS_FOR_DAY, {
+        "child_id": current_user.id,
+        "date": today
+    })
+    progress = result.scalars().first()
 
     if not progress:
         progress = DailyProgress(
             child_id=current_user.id,
             date=today,
-            total_points=0,
-            completed_task_ids=[],
-            pending_approval_ids=[],
-            redeemed_reward_ids=[]
+            total_points=0
         )
         db.add(progress)
 
     # Check if already completed or pending
-    if task_id in (progress.completed_task_ids or []):
+    result = await db.execute(select(DailyTaskStatus.state).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date == today,
+        DailyTaskStatus.task_id == task_id
+    ))
+    existing_state = result.scalar()
+    if existing_state == TaskState.COMPLETED:
         raise HTTPException(status_code=400, detail="Task already completed today")
-    if task_id in (progress.pending_approval_ids or []):
+    if existing_state == TaskState.PENDING_APPROVAL:
         raise HTTPException(status_code=400, detail="Task pending approval")
 
     # Check if task requires approval
     if task.requires_approval:
-        # Add to pending approvals list
-        if progress.pending_approval_ids is None:
-            progress.pending_approval_ids = []
-        progress.pending_approval_ids.append(task_id)
-        flag_modified(progress, 'pending_approval_ids')
+        # Mark as pending approval
+        db.add(DailyTaskStatus(
+            child_id=current_user.id,
+            date=today,
+            task_id=task_id,
+            state=TaskState.PENDING_APPROVAL
+        ))
 
         # Create approval request
         approval = TaskApproval(
@@ -212,29 +255,35 @@ async def complete_task(
             status=ApprovalStatus.PENDING
         )
         db.add(approval)
-        db.commit()
+        await commit_task_status(db)
+        record_write(current_user.family_id)
+        family_responses.bump(current_user.family_id)
 
         return {"message": "Task submitted for approval!", "requires_approval": True}
     else:
-        # Add to completed tasks and award points immediately
-        if progress.completed_task_ids is None:
-            progress.completed_task_ids = []
-        progress.completed_task_ids.append(task_id)
+        # Mark as completed and award points immediately
+        db.add(DailyTaskStatus(
+            child_id=current_user.id,
+            date=today,
+            task_id=task_id,
+            state=TaskState.COMPLETED
+        ))
         progress.total_points += task.points
-        flag_modified(progress, 'completed_task_ids')
 
         # Update user's total points
-        current_user.total_lifetime_points += task.points
+        profile = await live_profile(db, current_user)
+        profile.total_lifetime_points += task.points
+        await record_points(db, profile.id, task.points, LedgerEvent.EARN, task_id=task.id)
 
         # Update streak
-        streak_count = update_streak(current_user, db)
+        streak_count = await update_streak(profile, db)
 
         # Record detailed completion for analytics
         from app.models.task_completion import TaskCompletion
         completion_record = TaskCompletion(
-            child_id=current_user.id,
+            child_id=profile.id,
             task_id=task.id,
-            family_id=current_user.family_id,
+            family_id=profile.family_id,
             task_title=task.title,
             task_category=task.category.value if hasattr(task.category, 'value') else str(task.category),
             task_period=task.period.value if hasattr(task.period, 'value') else str(task.period),
@@ -243,13 +292,16 @@ async def complete_task(
             required_approval=0
         )
         db.add(completion_record)
+        await record_completion(db, completion_record)
 
-        db.commit()
+        await commit_task_status(db)
+        record_write(profile.family_id)
+        family_responses.bump(profile.family_id)
 
         return {
             "message": "Task completed!",
             "points_earned": task.points,
-            "new_total": current_user.total_lifetime_points,
+            "new_total": profile.total_lifetime_points,
             "current_streak": streak_count
         }
 
@@ -257,60 +309,73 @@ async def complete_task(
 @router.post("/{task_id}/uncomplete")
 async def uncomplete_task(
     task_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a task as incomplete (remove completion)"""
-    from sqlalchemy.orm.attributes import flag_modified
 
     # Verify task exists and belongs to family
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.family_id == current_user.family_id
-    ).first()
+    result = await db.execute(FAMILY_TASK, {
+        "task_id": task_id,
+        "family_id": current_user.family_id
+    })
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Get today's progress record
     today = date.today()
-    progress = db.query(DailyProgress).filter(
-        DailyProgress.child_id == current_user.id,
-        DailyProgress.date == today
-    ).first()
+    result = await db.execute(DAILY_PROGRESS_FOR_DAY, {
+        "child_id": current_user.id,
+        "date": today
+    })
+    progress = result.scalars().first()
 
     if not progress:
         raise HTTPException(status_code=400, detail="No progress record found for today")
 
     # Check if task is actually completed
-    if task_id not in (progress.completed_task_ids or []):
+    result = await db.execute(select(DailyTaskStatus).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date == today,
+        DailyTaskStatus.task_id == task_id,
+        DailyTaskStatus.state == TaskState.COMPLETED
+    ))
+    task_status = result.scalars().first()
+    if not task_status:
         raise HTTPException(status_code=400, detail="Task is not completed")
 
-    # Remove from completed tasks and deduct points
-    progress.completed_task_ids.remove(task_id)
+    # Remove the completion and deduct points
+    await db.delete(task_status)
     progress.total_points -= task.points
-    flag_modified(progress, 'completed_task_ids')
 
     # Update user's total points
-    current_user.total_lifetime_points -= task.points
+    profile = await live_profile(db, current_user)
+    profile.total_lifetime_points -= task.points
+    await record_points(db, profile.id, -task.points, LedgerEvent.UNDO, task_id=task.id)
 
     # Remove the TaskCompletion record for analytics
     from app.models.task_completion import TaskCompletion
-    completion_record = db.query(TaskCompletion).filter(
-        TaskCompletion.child_id == current_user.id,
+    result = await db.execute(select(TaskCompletion).filter(
+        TaskCompletion.child_id == profile.id,
         TaskCompletion.task_id == task.id,
         TaskCompletion.completion_date == today
-    ).first()
+    ))
+    completion_record = result.scalars().first()
 
     if completion_record:
-        db.delete(completion_record)
+        await record_completion(db, completion_record, sign=-1)
+        await db.delete(completion_record)
 
-    db.commit()
+    await db.commit()
+    record_write(profile.family_id)
+    family_responses.bump(profile.family_id)
 
     return {
         "message": "Task uncompleted",
         "points_deducted": task.points,
-        "new_total": current_user.total_lifetime_points
+        "new_total": profile.total_lifetime_points
     }
 
 
@@ -318,18 +383,19 @@ async def uncomplete_task(
 async def update_task(
     task_id: int,
     task_data: dict,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a task (parent only)"""
     if current_user.role != "parent":
         raise HTTPException(status_code=403, detail="Only parents can update tasks")
 
     # Verify task exists and belongs to family
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.family_id == current_user.family_id
-    ).first()
+    result = await db.execute(FAMILY_TASK, {
+        "task_id": task_id,
+        "family_id": current_user.family_id
+    })
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -355,7 +421,7 @@ async def update_task(
     # Update assignments if provided
     if "assigned_to" in task_data:
         # Delete existing assignments
-        db.query(TaskAssignment).filter(TaskAssignment.task_id == task_id).delete()
+        await db.execute(delete(TaskAssignment).filter(TaskAssignment.task_id == task_id))
 
         # Add new assignments
         for child_id in task_data["assigned_to"]:
@@ -365,57 +431,64 @@ async def update_task(
             )
             db.add(assignment)
 
-    db.commit()
+    await db.commit()
+    record_write(current_user.family_id)
+    family_responses.bump(current_user.family_id)
     return {"message": "Task updated successfully!"}
 
 
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a task (parent only)"""
     if current_user.role != "parent":
         raise HTTPException(status_code=403, detail="Only parents can delete tasks")
 
     # Verify task exists and belongs to family
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.family_id == current_user.family_id
-    ).first()
+    result = await db.execute(FAMILY_TASK, {
+        "task_id": task_id,
+        "family_id": current_user.family_id
+    })
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Delete task assignments first (foreign key constraint)
-    db.query(TaskAssignment).filter(TaskAssignment.task_id == task_id).delete()
+    await db.execute(delete(TaskAssignment).filter(TaskAssignment.task_id == task_id))
 
     # Delete the task
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
+    record_write(current_user.family_id)
+    family_responses.bump(current_user.family_id)
 
     return {"message": "Task deleted successfully!"}
 
 
-@router.get("/{task_id}/assignments")
+@router.get("/{task_id}/assignments", dependencies=[Depends(check_etag)])
 async def get_task_assignments(
     task_id: int,
-    current_user: Profile = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get children assigned to a task"""
     # Verify task exists and belongs to family
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.family_id == current_user.family_id
-    ).first()
+    result = await db.execute(FAMILY_TASK, {
+        "task_id": task_id,
+        "family_id": current_user.family_id
+    })
+    task = result.scalars().first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    assignments = db.query(TaskAssignment).filter(
+    result = await db.execute(select(TaskAssignment).filter(
         TaskAssignment.task_id == task_id
-    ).all()
+    ))
+    assignments = result.scalars().all()
 
     return {"assigned_child_ids": [a.child_id for a in assignments]}
\ No newline at end of file
@@ -4,7 +4,7 @@ Application configuration using Pydantic Settings
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 from functools import lru_cache
-from typing import List, Union
+from typing import List, Optional, Union
 
 
 class Settings(BaseSettings):
@@ -22,10 +22,62 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
 
+    # Database connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_PREWARM: bool = True  # open DB_POOL_SIZE connections at startup
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500  # asyncpg server-side prepared statements per connection
+
+    # Read replica (optional) for read-heavy analytics/progress endpoints
+    DATABASE_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: int = 10  # pin a family to the primary after it writes
+
+    # Query diagnostics
+    N_PLUS_ONE_THRESHOLD: int = 5  # warn when one statement shape repeats this often per request
+    DB_RAISE_ON_LAZY_LOAD: bool = False  # strict mode for tests: lazy relationship loads raise
+    SLOW_QUERY_THRESHOLD_MS: int = 250  # 0 disables the slow query log
+    SLOW_QUERY_LOG_SIZE: int = 200  # entries kept for /api/admin/db/slow-queries
+    SLOW_QUERY_EXPLAIN: bool = True  # capture EXPLAIN for slow SELECTs
+
+    # Partitioning
+    PARTITION_MONTHS_AHEAD: int = 3  # future monthly task_completions partitions kept ready
+
+    # Completion archive (months older than this move to compressed files)
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 400  # keep above 365 so year/trend views never reach archived days
+
+    # Templates
+    TEMPLATE_CACHE_DIR: Optional[str] = ".template_cache"  # compiled bytecode shared by workers and restarts
+    TEMPLATE_AUTO_RELOAD: Optional[bool] = None  # stat template files on every render; defaults to DEBUG
+
+    # Cache storage: "memory" (per worker, invalidations broadcast to the other
+    # workers) or "file" (one store per host shared by all workers, under CACHE_DIR)
+    CACHE_BACKEND: str = "memory"
+    CACHE_DIR: Optional[str] = None  # defaults to /dev/shm/<app>-cache
+
+    # Authenticated-user cache (0 disables)
+    PROFILE_CACHE_SIZE: int = 10000  # profile snapshots kept per process (or host)
+    PROFILE_CACHE_TTL_SECONDS: int = 30  # bounds staleness for writes made by other processes
+
+    # Family-versioned response cache for task/reward/member listings (0 disables)
+    RESPONSE_CACHE_SIZE: int = 5000  # cached responses per process (or host)
+    RESPONSE_CACHE_TTL_SECONDS: int = 60  # bounds staleness for writes made by other processes
+
+    # Analytics aggregates, updated in place by completion events (0 disables)
+    ANALYTICS_CACHE_SIZE: int = 2000  # cached (child or family, date range) aggregates per process (or host)
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300  # bounds staleness for writes made by other processes
+
+    # Points ledger
+    POINTS_SNAPSHOT_INTERVAL: int = 50  # ledger entries per child between balance snapshots
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    TOKEN_CACHE_SIZE: int = 10000  # verified JWTs cached until their exp (0 disables)
 
     # Environment
     ENVIRONMENT: str = "development"
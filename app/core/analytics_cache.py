@@ -0,0 +1,204 @@
+"""
+Incrementally maintained cache of analytics aggregates
+
+Child and family analytics cache their completion aggregates per
+(scope, scope id, start date, end date):
+
+    {"tasks", "points", "by_period", "by_category", "by_day" | "by_child"}
+
+where the by_* values map a key to {"tasks", "points"} (children have
+by_day, families by_child). TaskCompletion inserts and deletes are collected
+at flush and applied to every cached aggregate they fall into once the
+transaction commits, so completing or undoing a task adjusts the cached
+totals instead of discarding a year of work. Entries are replaced
+copy-on-write, so a payload being serialized is never modified underneath.
+With the memory backend the events are also broadcast to the other workers,
+which drop the aggregates they cover rather than applying the deltas: their
+entries may have been computed after the commit and already include them.
+ANALYTICS_CACHE_TTL_SECONDS bounds staleness for writes made outside the app.
+"""
+from datetime import date
+import copy
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.cache_backend import get_backend
+from app.core.cache_bus import cache_bus
+from app.models.task_completion import TaskCompletion
+
+settings = get_settings()
+
+
+class AnalyticsCache:
+    """Analytics aggregates in a cache backend, updated in place by completion events"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.events_applied = 0
+        self._backend = get_backend("analytics", max_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def generation(self, scope: str, scope_id: int) -> int:
+        """Completion events seen for the scope"""
+        return self._backend.counter(f"generation-{scope}-{scope_id}")
+
+    def get(self, scope: str, scope_id: int, start_date, end_date):
+        """Cached aggregate for the range; treat it as read-only"""
+        entry = self._backend.get(_key(scope, scope_id, start_date, end_date))
+        if entry is None or entry[0] < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, scope: str, scope_id: int, start_date, end_date, summary: dict, generation: int):
+        """Cache `summary` unless a completion event for the scope arrived since `generation` was read"""
+        if not self.enabled:
+            return
+        with self._backend.lock():
+            if self.generation(scope, scope_id) != generation:
+                return  # built from rows that may predate the event
+            # The expiry travels with the entry so that applying events doesn't extend it
+            entry = (time.time() + self.ttl, summary)
+            self._backend.set(_key(scope, scope_id, start_date, end_date), entry, self.ttl)
+
+    def apply(self, completions: list):
+        """Add (+1) or remove (-1) completions: [(sign, child_id, family_id, date, period, category, points)]"""
+        with self._backend.lock():
+            for sign, child_id, family_id, day, task_period, task_category, points in completions:
+                for scope, scope_id in (("child", child_id), ("family", family_id)):
+                    self._backend.incr(f"generation-{scope}-{scope_id}")
+                    for key in self._backend.keys(f"{scope}:{scope_id}:"):
+                        start_date, end_date = key.split(":")[2:]
+                        if not start_date <= day.isoformat() <= end_date:
+                            continue
+                        entry = self._backend.get(key)
+                        if entry is None:
+                            continue
+                        expires_at, summary = entry
+                        summary = copy.deepcopy(summary)
+                        summary["tasks"] += sign
+                        summary["points"] += sign * points
+                        buckets = {
+                            "by_period": task_period, "by_category": task_category, "by_day": day, "by_child": child_id
+                        }
+                        for bucket, bucket_key in buckets.items():
+                            if bucket in summary:
+                                _adjust(summary[bucket], bucket_key, sign, points)
+                        if expires_at > time.time():
+                            self._backend.set(key, (expires_at, summary), expires_at - time.time())
+                self.events_applied += 1
+        if not self._backend.shared:
+            # Dates travel as ordinals
+            for chunk in range(0, len(completions), _EVENTS_PER_MESSAGE):
+                cache_bus.publish("analytics", [
+                    (sign, child_id, family_id, day.toordinal(), task_period, task_category, points)
+                    for sign, child_id, family_id, day, task_period, task_category, points
+                    in completions[chunk:chunk + _EVENTS_PER_MESSAGE]
+                ])
+
+    def invalidate(self, completions: list):
+        """Drop cached aggregates covering the completions' dates and bump their generations"""
+        with self._backend.lock():
+            for _, child_id, family_id, day, *_ in completions:
+                for scope, scope_id in (("child", child_id), ("family", family_id)):
+                    # In-flight reads of the scope won't cache what they computed either
+                    self._backend.incr(f"generation-{scope}-{scope_id}")
+                    for key in self._backend.keys(f"{scope}:{scope_id}:"):
+                        start_date, end_date = key.split(":")[2:]
+                        if start_date <= day.isoformat() <= end_date:
+                            self._backend.delete(key)
+
+    def clear(self):
+        self._backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__,
+            "size": len(self._backend),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "events_applied": self.events_applied,
+        }
+
+
+# NOTIFY payloads are limited to 8000 bytes
+_EVENTS_PER_MESSAGE = 50
+
+
+def _key(scope: str, scope_id: int, start_date, end_date) -> str:
+    return f"{scope}:{scope_id}:{start_date.isoformat()}:{end_date.isoformat()}"
+
+
+def _adjust(bucket: dict, key, sign: int, points: int):
+    totals = bucket.setdefault(key, {"tasks": 0, "points": 0})
+    totals["tasks"] += sign
+    totals["points"] += sign * points
+    if totals["tasks"] <= 0:
+        del bucket[key]  # a recomputation wouldn't list it either
+
+
+analytics_cache = AnalyticsCache(settings.ANALYTICS_CACHE_SIZE, settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+
+def _remote_completions(events: list):
+    analytics_cache.invalidate([
+        (sign, child_id, family_id, date.fromordinal(day), task_period, task_category, points)
+        for sign, child_id, family_id, day, task_period, task_category, points in events
+    ])
+
+
+cache_bus.subscribe("analytics", _remote_completions)
+
+
+# ==============================================================================
+# COMPLETION EVENTS
+# ==============================================================================
+
+_PENDING_KEY = "analytics_cache_pending"
+
+
+def _completion_event(sign: int, completion: TaskCompletion) -> tuple:
+    return (
+        sign, completion.child_id, completion.family_id, completion.completion_date,
+        completion.task_period, completion.task_category, completion.points_earned
+    )
+
+
+def _completions_flushed(session, flush_context):
+    # new/deleted still hold the pre-flush state here
+    events = [
+        _completion_event(1, instance) for instance in session.new if isinstance(instance, TaskCompletion)
+    ] + [
+        _completion_event(-1, instance) for instance in session.deleted if isinstance(instance, TaskCompletion)
+    ]
+    if events:
+        session.info.setdefault(_PENDING_KEY, []).extend(events)
+
+
+def _committed(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        analytics_cache.apply(events)
+
+
+def _rolled_back(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_flush", _completions_flushed)
+event.listen(Session, "after_commit", _committed)
+event.listen(Session, "after_soft_rollback", _rolled_back)
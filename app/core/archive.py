@@ -0,0 +1,307 @@
+"""
+Archive of aged task completions in compressed columnar files
+
+Completions from months older than ARCHIVE_AFTER_DAYS move out of the
+database into one file per family and month:
+
+    ARCHIVE_DIR/family_<id>/<YYYY-MM>.tca
+
+The database keeps their CompletionRollup rows, which analytics read. A file
+is a small JSON header followed by one zlib-compressed block per column:
+integers as fixed-width arrays, strings dictionary-encoded as uint16 codes.
+Readers mmap the file and decompress each block straight out of the mapping,
+then view the result with memoryview.cast, so character progress and rollup
+rebuilds never load archived rows through the ORM.
+"""
+from array import array
+from datetime import date, datetime, timedelta
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from sqlalchemy import func, select, text
+
+from app.config import get_settings
+from app.core.partitions import add_months, completions_source_sync, month_start, month_table, partition_name
+from app.models.task_completion import TaskCompletion
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TCA1"
+EPOCH = datetime(1970, 1, 1)
+
+# Column name -> array typecode, or "dict" for dictionary-encoded strings
+COLUMNS = {
+    "id": "q",
+    "child_id": "q",
+    "task_id": "q",
+    "task_title": "dict",
+    "task_category": "dict",
+    "task_period": "dict",
+    "points_earned": "i",
+    "completed_at": "q",  # microseconds since EPOCH
+    "completion_date": "i",  # date.toordinal()
+    "required_approval": "b",
+}
+
+
+def archive_path(family_id: int, month: date) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, f"family_{family_id}", f"{month:%Y-%m}.tca")
+
+
+def archived_months(family_id: int) -> list:
+    """Months with an archive file for this family, oldest first"""
+    directory = os.path.join(settings.ARCHIVE_DIR, f"family_{family_id}")
+    if not os.path.isdir(directory):
+        return []
+    months = []
+    for name in os.listdir(directory):
+        if name.endswith(".tca"):
+            year, month = name[:-4].split("-")
+            months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def _encode(column: str, values: list):
+    """Column values -> (block bytes, header entry)"""
+    typecode = COLUMNS[column]
+    if typecode == "dict":
+        dictionary = sorted(set(values))
+        codes = {value: code for code, value in enumerate(dictionary)}
+        data = array("H", (codes[value] for value in values))
+        entry = {"type": "H", "dictionary": dictionary}
+    else:
+        data = array(typecode, values)
+        entry = {"type": typecode}
+    return zlib.compress(data.tobytes()), entry
+
+
+def write_archive(path: str, family_id: int, month: date, rows: list):
+    """Write completion rows (dicts keyed by COLUMNS) to `path` atomically"""
+    blocks = []
+    header = {
+        "family_id": family_id,
+        "month": f"{month:%Y-%m}",
+        "rows": len(rows),
+        "byteorder": sys.byteorder,
+        "columns": {},
+    }
+    offset = 0
+    for column in COLUMNS:
+        block, entry = _encode(column, [row[column] for row in rows])
+        entry.update({"offset": offset, "length": len(block)})
+        header["columns"][column] = entry
+        blocks.append(block)
+        offset += len(block)
+
+    header_bytes = json.dumps(header).encode()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ArchiveFile:
+    """Memory-mapped reader for one archive file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a completion archive")
+        (header_length,) = struct.unpack_from("<I", self._map, 4)
+        self._data_start = 8 + header_length
+        self.header = json.loads(self._map[8:self._data_start])
+        self.rows = self.header["rows"]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def codes(self, column: str) -> memoryview:
+        """Raw column values (dictionary codes for string columns) as a typed memoryview"""
+        entry = self.header["columns"][column]
+        start = self._data_start + entry["offset"]
+        with memoryview(self._map) as mapped:
+            with mapped[start:start + entry["length"]] as block:
+                data = zlib.decompress(block)
+        if self.header["byteorder"] != sys.byteorder:
+            swapped = array(entry["type"], data)
+            swapped.byteswap()
+            data = swapped.tobytes()
+        return memoryview(data).cast(entry["type"])
+
+    def dictionary(self, column: str) -> list:
+        return self.header["columns"][column]["dictionary"]
+
+    def column(self, column: str) -> list:
+        """Decoded column values"""
+        values = self.codes(column)
+        if COLUMNS[column] == "dict":
+            dictionary = self.dictionary(column)
+            return [dictionary[code] for code in values]
+        return values.tolist()
+
+    def to_rows(self) -> list:
+        """All rows as dicts (used when merging late rows into an existing file)"""
+        columns = {column: self.column(column) for column in COLUMNS}
+        return [
+            {column: values[index] for column, values in columns.items()}
+            for index in range(self.rows)
+        ]
+
+
+def archived_rollups(start_date: date = None, end_date: date = None) -> list:
+    """
+    CompletionRollup rows for archived completions in the range, all families
+
+    Used to rebuild rollups (app.core.rollups.rebuild_rollups). Blocking file IO.
+    """
+    if not os.path.isdir(settings.ARCHIVE_DIR):
+        return []
+
+    totals = {}
+    first_day = start_date.toordinal() if start_date else 1
+    last_day = end_date.toordinal() if end_date else date.max.toordinal()
+    for name in sorted(os.listdir(settings.ARCHIVE_DIR)):
+        if not name.startswith("family_"):
+            continue
+        family_id = int(name[len("family_"):])
+        for month in archived_months(family_id):
+            if (start_date and add_months(month, 1) <= start_date) or (end_date and month > end_date):
+                continue
+            with ArchiveFile(archive_path(family_id, month)) as archive:
+                periods = archive.dictionary("task_period")
+                categories = archive.dictionary("task_category")
+                rows = zip(
+                    archive.codes("child_id"),
+                    archive.codes("completion_date"),
+                    archive.codes("points_earned"),
+                    archive.codes("task_period"),
+                    archive.codes("task_category"),
+                )
+                for child_id, day, points, period_code, category_code in rows:
+                    if day < first_day or day > last_day:
+                        continue
+                    key = (child_id, day, periods[period_code], categories[category_code])
+                    entry = totals.setdefault(key, {"family_id": family_id, "tasks": 0, "points": 0})
+                    entry["tasks"] += 1
+                    entry["points"] += points
+
+    return [
+        {
+            "child_id": child_id, "family_id": entry["family_id"], "date": date.fromordinal(day),
+            "task_period": task_period, "task_category": task_category,
+            "tasks": entry["tasks"], "points": entry["points"],
+        }
+        for (child_id, day, task_period, task_category), entry in totals.items()
+    ]
+
+
+def archived_task_count(family_id: int, child_id: int, task_ids: set = None) -> int:
+    """Archived completions by one child, optionally only of the given tasks"""
+    if task_ids is not None and not task_ids:
+        return 0
+    count = 0
+    for month in archived_months(family_id):
+        with ArchiveFile(archive_path(family_id, month)) as archive:
+            for row_child_id, task_id in zip(archive.codes("child_id"), archive.codes("task_id")):
+                if row_child_id == child_id and (task_ids is None or task_id in task_ids):
+                    count += 1
+    return count
+
+
+def _row_values(completion) -> dict:
+    return {
+        "id": completion.id,
+        "child_id": completion.child_id,
+        "task_id": completion.task_id,
+        "task_title": completion.task_title,
+        "task_category": completion.task_category,
+        "task_period": completion.task_period,
+        "points_earned": completion.points_earned,
+        "completed_at": (completion.completed_at - EPOCH) // timedelta(microseconds=1),
+        "completion_date": completion.completion_date.toordinal(),
+        "required_approval": completion.required_approval or 0,
+    }
+
+
+def archive_month(db, month: date) -> int:
+    """
+    Move one month of completions into archive files; returns rows archived
+
+    Files are written (merged with any existing file) before the database
+    transaction that deletes the rows, so a failure in between leaves the
+    rows in place and a re-run dedupes them by id. Their rollups already
+    exist (maintained on write) and stay.
+    """
+    month_end = add_months(month, 1) - timedelta(days=1)
+    completions_table = completions_source_sync(db, month, month_end)
+    completions = db.execute(select(completions_table).filter(
+        completions_table.completion_date >= month,
+        completions_table.completion_date <= month_end
+    )).scalars().all()
+    if not completions:
+        return 0
+
+    by_family = {}
+    for completion in completions:
+        by_family.setdefault(completion.family_id, []).append(_row_values(completion))
+
+    for family_id, rows in by_family.items():
+        path = archive_path(family_id, month)
+        if os.path.exists(path):
+            with ArchiveFile(path) as existing:
+                archived_ids = set(existing.codes("id"))
+                merged = existing.to_rows()
+            merged.extend(row for row in rows if row["id"] not in archived_ids)
+            rows = sorted(merged, key=lambda row: row["id"])
+        write_archive(path, family_id, month, rows)
+
+    live = TaskCompletion.__table__
+    db.execute(live.delete().filter(live.c.completion_date >= month, live.c.completion_date <= month_end))
+    if db.get_bind().dialect.name == "sqlite":
+        month_table(month).drop(db.connection(), checkfirst=True)
+    elif db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+    db.commit()
+
+    logger.info(f"🗄️ Archived {len(completions)} completions from {month:%Y-%m} ({len(by_family)} families)")
+    return len(completions)
+
+
+def archive_completions(db, older_than_days: int = None) -> int:
+    """Archive every whole month that ended more than `older_than_days` ago"""
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = date.today() - timedelta(days=older_than_days)
+
+    completions_table = completions_source_sync(db, None, cutoff)
+    oldest = db.scalar(select(func.min(completions_table.completion_date)))
+    if oldest is None:
+        return 0
+
+    archived = 0
+    month = month_start(oldest)
+    while add_months(month, 1) <= cutoff:
+        archived += archive_month(db, month)
+        month = add_months(month, 1)
+    return archived
@@ -0,0 +1,326 @@
+"""
+Storage backends for the in-app caches (profiles, tokens, responses, analytics)
+
+CACHE_BACKEND=memory (default): every worker process keeps its own LRU.
+Invalidations are broadcast to the other workers on the host over the
+invalidation bus (app.core.cache_bus), so a write in one worker evicts the
+entry everywhere.
+
+CACHE_BACKEND=file: entries are pickled into one file each under CACHE_DIR
+(/dev/shm when available, so it is shared memory in practice) and shared by
+every worker on the host: one warm cache per host instead of per worker.
+Counters (versions, generations) are files updated under flock, and writes
+are atomic renames, so a reader never sees a partial entry.
+
+The directory must belong to the app's user with mode 0700, and every entry
+carries an HMAC keyed from SECRET_KEY that is checked before unpickling, so
+files planted by another local user are never loaded.
+
+Each cache gets its own namespace:
+
+    backend = get_backend("profiles", max_size=10000)
+    backend.set("42", snapshot, ttl=30)
+    backend.get("42")
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import re
+import secrets
+import stat
+import tempfile
+import threading
+import time
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+_KEY = re.compile(r"^[\w.:=-]+$")
+
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class MemoryBackend:
+    """Per-process LRU with per-entry expiry"""
+
+    shared = False
+
+    MIN_COUNTERS = 1000  # counters kept even when max_size is smaller
+
+    def __init__(self, name: str, max_size: int):
+        self.name = name
+        self.max_size = max_size
+        # Versions restart with the process, so anything derived from them is salted per process
+        self.instance_id = secrets.token_hex(8)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        # Least recently used counters are dropped; a missing one reads as the highest
+        # value dropped so far, so it never goes back to a value it had before an incr()
+        self._counters = OrderedDict()
+        self._max_counters = max(max_size, self.MIN_COUNTERS)
+        self._counter_floor = 0
+        self._lock = threading.RLock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def keys(self, prefix: str = "") -> list:
+        with self._lock:
+            return [key for key in self._entries if key.startswith(prefix)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def prune(self):
+        """Drop expired entries"""
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+                del self._entries[key]
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            if key not in self._counters:
+                return self._counter_floor
+            self._counters.move_to_end(key)
+            return self._counters[key]
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self.counter(key) + 1
+            self._counters[key] = value
+            self._counters.move_to_end(key)
+            while len(self._counters) > self._max_counters:
+                _, dropped = self._counters.popitem(last=False)
+                self._counter_floor = max(self._counter_floor, dropped)
+            return value
+
+    @contextmanager
+    def lock(self):
+        """Hold for read-modify-write sequences"""
+        with self._lock:
+            yield
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileBackend:
+    """Entries shared by all processes on the host, one pickle file per key"""
+
+    shared = True
+
+    PRUNE_EVERY = 200  # sets between size checks
+
+    def __init__(self, name: str, max_size: int, directory: str):
+        self.name = name
+        self.max_size = max_size
+        self._dir = os.path.join(directory, name)
+        self._counter_dir = os.path.join(self._dir, ".counters")
+        for path in (self._dir, self._counter_dir):
+            os.makedirs(path, mode=0o700, exist_ok=True)
+        self._signing_key = signing_key("entries")
+        self.instance_id = self._read_instance_id(directory)
+        self._lock_path = os.path.join(self._dir, ".lock")
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._sets = 0
+
+    @staticmethod
+    def _read_instance_id(directory: str) -> str:
+        """Id of the store itself (same for every worker using it)"""
+        path = os.path.join(directory, ".instance")
+        if not os.path.exists(path):
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(8))
+            try:
+                os.link(temp_path, path)  # the first worker to get here wins
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(temp_path)
+        with open(path) as f:
+            return f.read().strip()
+
+    def _path(self, key: str) -> str:
+        if not _KEY.match(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return os.path.join(self._dir, key)
+
+    def _read(self, path: str):
+        """(expires_at, value) of an entry file, or None if missing or not signed by us"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        digest, payload = data[:_DIGEST_SIZE], data[_DIGEST_SIZE:]
+        if not hmac.compare_digest(digest, hmac.new(self._signing_key, payload, hashlib.sha256).digest()):
+            logger.warning(f"⚠️ Ignoring cache entry with a bad signature: {path}")
+            return None
+        return pickle.loads(payload)
+
+    def get(self, key: str):
+        entry = self._read(self._path(key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value, ttl: float):
+        payload = pickle.dumps((time.time() + ttl, value), pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(self._signing_key, payload, hashlib.sha256).digest()
+        _atomic_write(self._path(key), digest + payload)
+        self._sets += 1
+        if self._sets % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self, prefix: str = "") -> list:
+        return [name for name in os.listdir(self._dir) if not name.startswith(".") and name.startswith(prefix)]
+
+    def clear(self):
+        for key in self.keys():
+            self.delete(key)
+
+    def counter(self, key: str) -> int:
+        try:
+            with open(os.path.join(self._counter_dir, key)) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def incr(self, key: str) -> int:
+        with self.lock():
+            value = self.counter(key) + 1
+            _atomic_write(os.path.join(self._counter_dir, key), str(value).encode())
+            return value
+
+    @contextmanager
+    def lock(self):
+        """Host-wide lock for read-modify-write sequences (re-entrant within a process)"""
+        with self._thread_lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def prune(self):
+        """Drop expired entries, then the least recently written beyond max_size"""
+        entries = []
+        now = time.time()
+        for key in self.keys():
+            path = self._path(key)
+            entry = self._read(path)
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            if entry is None or entry[0] < now:
+                self.delete(key)
+            else:
+                entries.append((mtime, key))
+        for _, key in sorted(entries)[:max(len(entries) - self.max_size, 0)]:
+            self.delete(key)
+
+    def __len__(self):
+        return len(self.keys())
+
+
+def _atomic_write(path: str, data: bytes):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def signing_key(purpose: str) -> bytes:
+    """Key for authenticating shared cache data, derived from SECRET_KEY"""
+    return hmac.new(settings.SECRET_KEY.encode(), f"cache:{purpose}".encode(), hashlib.sha256).digest()
+
+
+def cache_dir() -> str:
+    """
+    CACHE_DIR, or a per-app directory in /dev/shm (falling back to the temp dir)
+
+    Created with mode 0700; raises RuntimeError if it already exists but is not
+    a directory owned by this user and closed to everyone else.
+    """
+    if settings.CACHE_DIR:
+        path = settings.CACHE_DIR
+    else:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        slug = re.sub(r"\W+", "-", settings.APP_NAME.lower()).strip("-")
+        path = os.path.join(base, f"{slug}-cache")
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(
+            f"Cache directory {path} must be a directory owned by uid {os.getuid()} with mode 0700; "
+            f"fix or remove it, or set CACHE_DIR"
+        )
+    return path
+
+
+def get_backend(name: str, max_size: int):
+    """Backend for one cache namespace, per CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "file":
+        return FileBackend(name, max_size, cache_dir())
+    if settings.CACHE_BACKEND != "memory":
+        logger.warning(f"⚠️ Unknown CACHE_BACKEND '{settings.CACHE_BACKEND}', using memory")
+    return MemoryBackend(name, max_size)
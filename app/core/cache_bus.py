@@ -0,0 +1,229 @@
+"""
+Host-local pub/sub for cache invalidations between worker processes
+
+With CACHE_BACKEND=memory every worker has its own caches, so an
+invalidation made in one worker is published here and replayed by the
+others. The transport follows the database:
+
+- Postgres: LISTEN/NOTIFY on the cache_invalidation channel, over one
+  dedicated autocommit connection per worker.
+- Anything else (SQLite): Unix datagram sockets, one per worker, in
+  CACHE_DIR/bus; a message is sent to every socket found there.
+
+Publishing never blocks a request: messages are queued and sent by the bus
+thread. Delivery is best-effort; cache TTLs bound the damage of a lost one.
+Messages carry an HMAC keyed from SECRET_KEY; unsigned ones are dropped.
+
+    cache_bus.subscribe("profiles", lambda user_ids: ...)
+    cache_bus.publish("profiles", [42])
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import secrets
+import select
+import socket
+import threading
+
+from app.config import get_settings
+from app.core.cache_backend import cache_dir, signing_key
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+
+class InvalidationBus:
+    """Topic -> handler registry with a cross-process transport"""
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.sent = 0
+        self.received = 0
+        self._handlers = {}
+        self._transport = None
+        self._signing_key = signing_key("bus")
+
+    @property
+    def running(self) -> bool:
+        return self._transport is not None
+
+    def subscribe(self, topic: str, handler):
+        """Call `handler(payload)` for messages on `topic` published by other processes"""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, payload):
+        """Send `payload` (JSON-serializable) to the other processes; no-op until started"""
+        if self._transport is None:
+            return
+        body = json.dumps({"origin": self.origin, "topic": topic, "payload": payload})
+        self._transport.send(self._sign(body) + body)
+        self.sent += 1
+
+    def _sign(self, body: str) -> str:
+        return hmac.new(self._signing_key, body.encode(), hashlib.sha256).hexdigest()
+
+    def deliver(self, message: str):
+        """Called by the transport thread for every incoming message"""
+        size = hashlib.sha256().digest_size * 2
+        signature, body = message[:size], message[size:]
+        if not hmac.compare_digest(signature, self._sign(body)):
+            logger.warning("⚠️ Ignoring cache invalidation message with a bad signature")
+            return
+        try:
+            data = json.loads(body)
+        except ValueError:
+            logger.warning("⚠️ Ignoring malformed cache invalidation message")
+            return
+        if data.get("origin") == self.origin:
+            return  # NOTIFY echoes our own messages back
+        self.received += 1
+        for handler in self._handlers.get(data.get("topic"), []):
+            try:
+                handler(data.get("payload"))
+            except Exception as e:
+                logger.error(f"❌ Cache invalidation handler for '{data.get('topic')}' failed: {e}")
+
+    def start(self, engine):
+        """Start the transport matching `engine` (a sync Engine)"""
+        if self._transport is not None:
+            return
+        try:
+            if engine.dialect.name == "postgresql":
+                self._transport = PostgresNotifyTransport(engine, self.deliver)
+            else:
+                self._transport = UnixSocketTransport(os.path.join(cache_dir(), "bus"), self.deliver)
+        except Exception as e:
+            logger.error(f"❌ Cache invalidation bus failed to start: {e}")
+            return
+        logger.info(f"📣 Cache invalidation bus started ({type(self._transport).__name__})")
+
+    def stop(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def stats(self) -> dict:
+        return {
+            "transport": type(self._transport).__name__ if self._transport else None,
+            "sent": self.sent,
+            "received": self.received,
+        }
+
+
+class PostgresNotifyTransport:
+    """LISTEN/NOTIFY over a dedicated psycopg2 connection (not taken from the pool)"""
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, engine, deliver):
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        self._conn = engine.dialect.dbapi.connect(*cargs, **cparams)
+        self._conn.autocommit = True
+        with self._conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        self._deliver = deliver
+        self._outgoing = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-bus", daemon=True)
+        self._thread.start()
+
+    def send(self, message: str):
+        self._outgoing.put(message)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                if select.select([self._conn], [], [], self.POLL_SECONDS)[0]:
+                    self._conn.poll()
+                    while self._conn.notifies:
+                        self._deliver(self._conn.notifies.pop(0).payload)
+                while not self._outgoing.empty():
+                    with self._conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, self._outgoing.get()))
+            except Exception as e:
+                if not self._stopped.is_set():
+                    logger.error(f"❌ Cache invalidation bus (Postgres) error: {e}")
+                    self._stopped.wait(1)
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join(timeout=2)
+        self._conn.close()
+
+
+class UnixSocketTransport:
+    """Datagram socket per worker in a shared directory; send = sendto every other socket"""
+
+    def __init__(self, directory: str, deliver):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._dir = directory
+        self._path = os.path.join(directory, f"{os.getpid()}-{secrets.token_hex(4)}.sock")
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self._path)
+        self._receiver.settimeout(0.5)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._deliver = deliver
+        self._outgoing = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._receive, name="cache-bus-receive", daemon=True),
+            threading.Thread(target=self._send, name="cache-bus-send", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def send(self, message: str):
+        self._outgoing.put(message)
+
+    def _receive(self):
+        while not self._stopped.is_set():
+            try:
+                data = self._receiver.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # closed
+            self._deliver(data.decode())
+
+    def _send(self):
+        while not self._stopped.is_set():
+            try:
+                message = self._outgoing.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            data = message.encode()
+            for name in os.listdir(self._dir):
+                path = os.path.join(self._dir, name)
+                if not name.endswith(".sock") or path == self._path:
+                    continue
+                try:
+                    self._sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a worker that exited without cleaning up
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except OSError as e:
+                    logger.warning(f"⚠️ Could not send cache invalidation to {name}: {e}")
+
+    def close(self):
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._receiver.close()
+        self._sender.close()
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+
+cache_bus = InvalidationBus()
@@ -2,49 +2,114 @@
 FastAPI dependencies for authentication and authorization
 """
 from typing import Optional
-from fastapi import Depends, HTTPException, status, Cookie
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import Depends, HTTPException, status, Cookie, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, ReplicaSessionLocal, has_recent_write
 from app.core.security import decode_access_token
-from app.models.profile import Profile
+from app.core.profile_cache import ProfileSnapshot, cached_profile
+from app.core.response_cache import family_responses
+from app.models.profile import UserRole
 
 
 async def get_current_user(
     access_token: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-) -> Optional[Profile]:
-    """Get the current authenticated user from JWT token in cookie"""
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[ProfileSnapshot]:
+    """
+    Get the current authenticated user from JWT token in cookie
+
+    Returns a read-only ProfileSnapshot; handlers that change the user or
+    need its relationships load the ORM object with live_profile().
+    """
     import logging
     logger = logging.getLogger(__name__)
 
-    logger.info(f"get_current_user called. Cookie received: {access_token is not None}")
+    logger.debug(f"get_current_user called. Cookie received: {access_token is not None}")
 
     if not access_token:
-        logger.warning("No access_token cookie found")
+        logger.debug("No access_token cookie found")
         return None
 
     try:
         # Decode token
         payload = decode_access_token(access_token)
         if payload is None:
-            logger.warning("Token decode returned None")
+            logger.debug("Token decode returned None")
             return None
 
         user_id_str = payload.get("sub")
-        logger.info(f"Decoded token, user_id (string): {user_id_str}")
-
         if user_id_str is None:
             logger.warning("No user_id in token payload")
             return None
 
         # Convert string back to int
         user_id = int(user_id_str)
-        logger.info(f"Converted user_id to int: {user_id}")
     except Exception as e:
         logger.error(f"Error decoding token: {e}")
         return None
 
-    # Get user from database
-    user = db.query(Profile).filter(Profile.id == user_id).first()
-    logger.info(f"User found in database: {user is not None}")
-    return user
\ No newline at end of file
+    # Cached read-only snapshot; handlers that write use live_profile()
+    user = await cached_profile(db, user_id)
+    logger.debug(f"User found: {user is not None}")
+    return user
+
+
+async def require_admin(
+    current_user: Optional[ProfileSnapshot] = Depends(get_current_user)
+) -> ProfileSnapshot:
+    """Require an authenticated family admin (operational endpoints)"""
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+async def get_read_db(
+    current_user: Optional[ProfileSnapshot] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Session for read-only endpoints
+
+    Uses the replica when one is configured, unless the user's family wrote
+    within READ_YOUR_WRITES_SECONDS (then the primary, so fresh writes show up).
+    """
+    if ReplicaSessionLocal is None or not current_user or has_recent_write(current_user.family_id):
+        yield db
+        return
+
+    async with ReplicaSessionLocal() as replica_db:
+        yield replica_db
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    current_user: Optional[ProfileSnapshot] = Depends(get_current_user)
+):
+    """
+    Conditional GET for family-scoped read endpoints (use as a route dependency)
+
+    Sets a strong ETag derived from the family version, the user and the URL,
+    and answers 304 Not Modified when If-None-Match already has it, before the
+    endpoint runs a query or serializes anything.
+    """
+    if not current_user or not current_user.family_id:
+        return
+
+    etag = family_responses.etag(current_user.family_id, current_user.id, request.url.path, request.url.query)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison, as RFC 9110 specifies for If-None-Match
+        candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,176 @@
+"""
+Monthly partitioning of task_completions
+
+Postgres: task_completions is natively partitioned by RANGE (completion_date)
+into task_completions_pYYYYMM tables (see migration 0004); the planner prunes
+partitions from the completion_date filter, so queries use TaskCompletion as is.
+
+SQLite: task_completions holds the current month (and late rows for earlier
+ones); at startup closed months are moved into task_completions_pYYYYMM tables.
+completions_source() returns TaskCompletion mapped onto a UNION ALL of only the
+tables that overlap the requested date range.
+"""
+from datetime import date
+import logging
+import re
+
+from sqlalchemy import Column, Index, MetaData, Table, func, select, text, union_all
+from sqlalchemy.orm import aliased
+
+from app.config import get_settings
+from app.models.task_completion import TaskCompletion
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "task_completions_p"
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+# Table objects for SQLite month tables, built on first use
+_partition_metadata = MetaData()
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str):
+    """Month a partition table holds, or None if `name` isn't one"""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def create_month_partitions(conn, first_month: date, last_month: date):
+    """Postgres: create monthly partitions of task_completions covering first..last month"""
+    month = first_month
+    while month <= last_month:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF task_completions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        month = add_months(month, 1)
+
+
+def month_table(month: date) -> Table:
+    """SQLite: the archive table for one month (same columns as task_completions)"""
+    name = partition_name(month)
+    if name not in _partition_metadata.tables:
+        live = TaskCompletion.__table__
+        Table(
+            name,
+            _partition_metadata,
+            *[
+                Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                for column in live.columns
+            ],
+            Index(f"ix_{name}_child_date", "child_id", "completion_date"),
+            Index(f"ix_{name}_family_date", "family_id", "completion_date"),
+        )
+    return _partition_metadata.tables[name]
+
+
+def is_partitioned(conn) -> bool:
+    """Postgres: whether task_completions is already a partitioned table"""
+    return conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('task_completions')"
+    )).scalar() is True
+
+
+def ensure_partitions(engine):
+    """
+    Startup maintenance
+
+    Postgres: create partitions for this month and PARTITION_MONTHS_AHEAD more
+    (rows outside them land in the DEFAULT partition). SQLite: move rows of
+    closed months out of task_completions into their month tables.
+    """
+    this_month = month_start(date.today())
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            if not is_partitioned(conn):
+                return
+        for ahead in range(settings.PARTITION_MONTHS_AHEAD + 1):
+            month = add_months(this_month, ahead)
+            try:
+                with engine.begin() as conn:
+                    create_month_partitions(conn, month, month)
+            except Exception as e:
+                # e.g. the DEFAULT partition already holds rows for this month
+                logger.error(f"❌ Could not create partition {partition_name(month)}: {e}")
+        return
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    live = TaskCompletion.__table__
+    with engine.begin() as conn:
+        closed_months = conn.execute(select(
+            func.distinct(func.strftime('%Y-%m', live.c.completion_date))
+        ).filter(live.c.completion_date < this_month)).scalars().all()
+
+        for month_key in closed_months:
+            month = date(int(month_key[:4]), int(month_key[5:7]), 1)
+            in_month = (live.c.completion_date >= month) & (live.c.completion_date < add_months(month, 1))
+            table = month_table(month)
+            table.create(conn, checkfirst=True)
+            conn.execute(table.insert().from_select(
+                [column.name for column in live.columns],
+                select(*live.columns).filter(in_month)
+            ))
+            conn.execute(live.delete().filter(in_month))
+            logger.info(f"📦 Moved {month_key} task completions into {table.name}")
+
+
+def _sqlite_partitions(sync_session) -> list:
+    rows = sync_session.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix"
+    ), {"prefix": f"{PARTITION_PREFIX}%"}).scalars()
+    return sorted(month for month in map(partition_month, rows) if month)
+
+
+def completions_source_sync(db, start_date: date = None, end_date: date = None):
+    """
+    TaskCompletion, or on SQLite an alias of it over the tables overlapping the range
+
+    Callers still filter on completion_date; the range here only picks tables.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return TaskCompletion
+
+    months = [
+        month for month in _sqlite_partitions(db)
+        if (start_date is None or add_months(month, 1) > start_date)
+        and (end_date is None or month <= end_date)
+    ]
+    if not months:
+        return TaskCompletion
+
+    live = TaskCompletion.__table__
+    branches = []
+    for table in [live] + [month_table(month) for month in months]:
+        branch = select(*[table.c[column.name] for column in live.columns])
+        if start_date is not None:
+            branch = branch.filter(table.c.completion_date >= start_date)
+        if end_date is not None:
+            branch = branch.filter(table.c.completion_date <= end_date)
+        branches.append(branch)
+    return aliased(TaskCompletion, union_all(*branches).subquery("task_completions_union"))
+
+
+async def completions_source(db, start_date: date = None, end_date: date = None):
+    """Async version of completions_source_sync for AsyncSession"""
+    if db.bind.dialect.name != "sqlite":
+        return TaskCompletion
+    return await db.run_sync(completions_source_sync, start_date, end_date)
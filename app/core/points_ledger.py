@@ -0,0 +1,130 @@
+"""
+Points ledger: append-only balance changes with periodic per-child snapshots
+
+Every change to Profile.total_lifetime_points is mirrored by a ledger entry in
+the same transaction. Every POINTS_SNAPSHOT_INTERVAL entries a snapshot stores
+the running balance, so a balance at any moment is the latest snapshot before
+it plus a tail of at most ~POINTS_SNAPSHOT_INTERVAL entries.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.points_ledger import PointsLedgerEntry, LedgerEvent
+from app.models.points_snapshot import PointsSnapshot
+
+settings = get_settings()
+
+
+async def _latest_snapshot(db: AsyncSession, child_id: int, at: datetime = None) -> Optional[PointsSnapshot]:
+    """Most recent snapshot for a child, optionally taken no later than `at`"""
+    query = select(PointsSnapshot).filter(PointsSnapshot.child_id == child_id)
+    if at is not None:
+        query = query.filter(PointsSnapshot.as_of <= at)
+    result = await db.execute(query.order_by(PointsSnapshot.ledger_id.desc()).limit(1))
+    return result.scalars().first()
+
+
+async def record_points(
+    db: AsyncSession,
+    child_id: int,
+    delta: int,
+    event: LedgerEvent,
+    task_id: int = None,
+    reward_id: int = None,
+    on_date: date = None
+):
+    """
+    Add a ledger entry (and a snapshot when one is due) to the session
+
+    Call before the commit that changes total_lifetime_points so both land
+    atomically. The snapshot covers entries already committed; the new entry
+    becomes part of the next snapshot's tail.
+    """
+    db.add(PointsLedgerEntry(
+        child_id=child_id,
+        event=event,
+        delta=delta,
+        task_id=task_id,
+        reward_id=reward_id,
+        date=on_date or date.today()
+    ))
+
+    snapshot = await _latest_snapshot(db, child_id)
+    after_id = snapshot.ledger_id if snapshot else 0
+    result = await db.execute(select(
+        func.count(PointsLedgerEntry.id).label('entries'),
+        func.coalesce(func.sum(PointsLedgerEntry.delta), 0).label('delta'),
+        func.max(PointsLedgerEntry.id).label('last_id'),
+        func.max(PointsLedgerEntry.occurred_at).label('last_at')
+    ).filter(
+        PointsLedgerEntry.child_id == child_id,
+        PointsLedgerEntry.id > after_id
+    ))
+    tail = result.one()
+
+    if tail.entries >= settings.POINTS_SNAPSHOT_INTERVAL:
+        db.add(PointsSnapshot(
+            child_id=child_id,
+            ledger_id=tail.last_id,
+            balance=(snapshot.balance if snapshot else 0) + tail.delta,
+            as_of=tail.last_at
+        ))
+
+
+async def balance_at(db: AsyncSession, child_id: int, at: datetime) -> int:
+    """A child's balance including every entry that occurred up to `at`"""
+    snapshot = await _latest_snapshot(db, child_id, at)
+    tail = await db.scalar(select(
+        func.coalesce(func.sum(PointsLedgerEntry.delta), 0)
+    ).filter(
+        PointsLedgerEntry.child_id == child_id,
+        PointsLedgerEntry.id > (snapshot.ledger_id if snapshot else 0),
+        PointsLedgerEntry.occurred_at <= at
+    ))
+    return (snapshot.balance if snapshot else 0) + tail
+
+
+async def balance_history(db: AsyncSession, child_id: int, start_date: date, end_date: date) -> list:
+    """Closing balance plus points earned/spent for each day in the range"""
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    balance = await balance_at(db, child_id, range_start - timedelta(microseconds=1))
+
+    result = await db.execute(select(
+        PointsLedgerEntry.occurred_at,
+        PointsLedgerEntry.delta
+    ).filter(
+        PointsLedgerEntry.child_id == child_id,
+        PointsLedgerEntry.occurred_at >= range_start,
+        PointsLedgerEntry.occurred_at < range_end
+    ).order_by(PointsLedgerEntry.occurred_at, PointsLedgerEntry.id))
+
+    gained_by_date = {}
+    spent_by_date = {}
+    for occurred_at, delta in result.all():
+        day = occurred_at.date()
+        if delta >= 0:
+            gained_by_date[day] = gained_by_date.get(day, 0) + delta
+        else:
+            spent_by_date[day] = spent_by_date.get(day, 0) - delta
+
+    history = []
+    current_date = start_date
+    while current_date <= end_date:
+        gained = gained_by_date.get(current_date, 0)
+        spent = spent_by_date.get(current_date, 0)
+        balance += gained - spent
+        history.append({
+            "date": current_date.isoformat(),
+            "points_gained": gained,
+            "points_lost": spent,
+            "balance": balance
+        })
+        current_date += timedelta(days=1)
+
+    return history
@@ -0,0 +1,104 @@
+"""
+Connection pool instrumentation: checkout wait times and live pool counters
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Cumulative checkout counters for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero all counters"""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_checkout(self, waited: float, timed_out: bool = False):
+        """Record one checkout attempt and how long it waited"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        """Counters as a JSON-friendly dict"""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_total * 1000, 2),
+                "wait_ms_avg": round(self.wait_total * 1000 / attempts, 2) if attempts else 0,
+                "wait_ms_max": round(self.wait_max * 1000, 2),
+            }
+
+
+class TimedCheckoutMixin:
+    """Times Pool.connect() so waits for a free connection become visible"""
+    stats: PoolStats = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            waited = time.perf_counter() - started
+            self.stats.record_checkout(waited, timed_out=True)
+            logger.warning(
+                f"⏳ Pool '{self.stats.name}' exhausted: no connection after {waited:.1f}s "
+                f"({self.status()})"
+            )
+            raise
+        self.stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+# One stats object per named engine, e.g. "primary", "primary_async"
+_registry = {}
+
+
+def instrumented_pool_class(name: str, async_: bool = False):
+    """
+    Build a pool class bound to the PoolStats for `name`
+
+    The stats live on the class so they survive Pool.recreate() (engine.dispose()).
+    """
+    stats = _registry.setdefault(name, PoolStats(name))
+    base = AsyncAdaptedQueuePool if async_ else QueuePool
+    return type(f"Instrumented{base.__name__}", (TimedCheckoutMixin, base), {"stats": stats})
+
+
+def pool_status(name: str, pool) -> dict:
+    """Live pool counters plus cumulative checkout stats"""
+    status = {"name": name, "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),  # connections open beyond pool size
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+        })
+    else:
+        status["status"] = pool.status()
+    if name in _registry:
+        status.update(_registry[name].snapshot())
+    return status
@@ -0,0 +1,182 @@
+"""
+Cache of authenticated-user profiles
+
+get_current_user returns a read-only ProfileSnapshot (all Profile columns)
+from a TTL/LRU cache (app.core.cache_backend) instead of querying profiles on
+every request. Any flush that inserts, updates or deletes a Profile evicts it,
+again after the commit, so theme changes, point changes and logins are seen
+on the next request (in every worker).
+Handlers that write to the user upgrade it first:
+
+    user = await live_profile(db, current_user)
+    user.total_lifetime_points += task.points
+"""
+import copy
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.cache_backend import get_backend
+from app.core.cache_bus import cache_bus
+from app.core.statements import PROFILE_BY_ID
+from app.models.profile import Profile
+
+settings = get_settings()
+
+_COLUMNS = [column.key for column in Profile.__mapper__.column_attrs]
+
+
+class ProfileSnapshot:
+    """Read-only copy of a Profile's column values"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: dict):
+        object.__setattr__(self, "_values", values)
+
+    @classmethod
+    def from_profile(cls, profile: Profile) -> "ProfileSnapshot":
+        # JSON columns (custom_colors) are copied so the snapshot can't be changed through them
+        return cls({key: copy.deepcopy(getattr(profile, key)) for key in _COLUMNS})
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Profile snapshots are read-only; use live_profile() to change '{name}'")
+
+    def __reduce__(self):
+        # For pickling into shared cache backends (__setattr__ is blocked)
+        return (ProfileSnapshot, (self._values,))
+
+    def __repr__(self):
+        return f"<ProfileSnapshot {self.first_name} ({self.role.value})>"
+
+
+class ProfileCache:
+    """ProfileSnapshot by user id in a cache backend, entries expire after `ttl` seconds"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._backend = get_backend("profiles", max_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation"""
+        return self._backend.counter("generation")
+
+    def get(self, user_id: int):
+        snapshot = self._backend.get(str(user_id))
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def put(self, snapshot: ProfileSnapshot, generation: int):
+        """Cache `snapshot` unless something was invalidated since `generation` was read"""
+        if not self.enabled:
+            return
+        with self._backend.lock():
+            if generation != self.generation:
+                return  # the row may have changed after it was loaded
+            self._backend.set(str(snapshot.id), snapshot, self.ttl)
+
+    def invalidate(self, *user_ids: int, broadcast: bool = True):
+        with self._backend.lock():
+            self._backend.incr("generation")
+            for user_id in user_ids:
+                self._backend.delete(str(user_id))
+        if broadcast and not self._backend.shared:
+            cache_bus.publish("profiles", list(user_ids))
+
+    def clear(self):
+        with self._backend.lock():
+            self._backend.incr("generation")
+            self._backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__,
+            "size": len(self._backend),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+profile_cache = ProfileCache(settings.PROFILE_CACHE_SIZE, settings.PROFILE_CACHE_TTL_SECONDS)
+cache_bus.subscribe("profiles", lambda user_ids: profile_cache.invalidate(*user_ids, broadcast=False))
+
+
+async def cached_profile(db, user_id: int):
+    """The user's ProfileSnapshot, from the cache or loaded into it; None if there is no such user"""
+    snapshot = profile_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    generation = profile_cache.generation
+    result = await db.execute(PROFILE_BY_ID, {"user_id": user_id})
+    profile = result.scalars().first()
+    if profile is None:
+        return None
+    snapshot = ProfileSnapshot.from_profile(profile)
+    profile_cache.put(snapshot, generation)
+    return snapshot
+
+
+async def live_profile(db, user) -> Profile:
+    """The ORM Profile for `user` (a snapshot or a Profile) in this session, for writes"""
+    if isinstance(user, Profile):
+        return user
+    result = await db.execute(PROFILE_BY_ID, {"user_id": user.id})
+    return result.scalars().one()
+
+
+# ==============================================================================
+# INVALIDATION
+# ==============================================================================
+
+_PENDING_KEY = "profile_cache_pending"
+
+
+def _profiles_flushed(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    user_ids = {
+        instance.id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, Profile) and instance.id is not None
+    }
+    if user_ids:
+        profile_cache.invalidate(*user_ids)
+        session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+def _transaction_ended(session):
+    # Again once the change is visible to other sessions (or rolled back)
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        profile_cache.invalidate(*user_ids)
+
+
+def _rolled_back(session, previous_transaction):
+    _transaction_ended(session)
+
+
+event.listen(Session, "after_flush", _profiles_flushed)
+event.listen(Session, "after_commit", _transaction_ended)
+event.listen(Session, "after_soft_rollback", _rolled_back)
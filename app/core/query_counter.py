@@ -0,0 +1,118 @@
+"""
+Per-request SQL statement counting and N+1 detection
+"""
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import re
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, raiseload
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Counter for the request currently being served (None outside a request)
+_current_counter: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions differing only in IN-list length compare equal"""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryCounter:
+    """Statements issued while serving one request"""
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.total = 0
+        self.shapes = Counter()
+
+    def record(self, statement: str):
+        self.total += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list:
+        """Statement shapes executed at least `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def get_current_counter() -> Optional[QueryCounter]:
+    """The active request's counter, if any"""
+    return _current_counter.get()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(statement)
+
+
+def install_query_counter(sync_engine):
+    """Count statements executed on this engine (pass `async_engine.sync_engine` for async)"""
+    if not event.contains(sync_engine, "before_cursor_execute", _count_statement):
+        event.listen(sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    if orm_execute_state.is_select and not orm_execute_state.is_relationship_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+def enable_strict_loading():
+    """
+    Make every relationship not explicitly eager-loaded raise on access
+
+    Meant for tests: turns hidden N+1 lazy loads into immediate errors.
+    """
+    if not event.contains(Session, "do_orm_execute", _raise_on_lazy_load):
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+class QueryCountMiddleware:
+    """
+    ASGI middleware: counts SQL statements per request
+
+    Adds an X-Query-Count response header, logs the count, and warns when the
+    same statement shape runs `threshold` or more times (a likely N+1).
+    """
+
+    def __init__(self, app, threshold: int = 5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter(scope.get("method", ""), scope.get("path", ""))
+        token = _current_counter.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Query-Count", str(counter.total))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current_counter.reset(token)
+            self.report(counter)
+
+    def report(self, counter: QueryCounter):
+        if counter.total == 0:
+            return
+        logger.info(f"🔢 {counter.method} {counter.path}: {counter.total} queries")
+        for shape, count in counter.repeated(self.threshold):
+            logger.warning(
+                f"🔁 Possible N+1 on {counter.method} {counter.path}: "
+                f"{count}x {shape[:200]}"
+            )
@@ -0,0 +1,145 @@
+"""
+Family-versioned response cache for family-wide listings
+
+Tasks, rewards, members and children listings are cached per
+(family_id, endpoint, role[, user id]) together with the family's version
+number. Task and reward CRUD, completions, approvals, redemptions and
+registration bump the version, as does any flushed change to a Profile
+(points, streaks, logins, themes), so a cached payload is served only while
+nothing it was built from has changed:
+
+    cached = family_responses.get(current_user.family_id, "rewards", current_user.role)
+    if cached is not None:
+        return cached
+    version = family_responses.version(current_user.family_id)
+    ...
+    return family_responses.put(current_user.family_id, "rewards", current_user.role, payload, version)
+
+The same versions back the ETags of family-scoped GET endpoints
+(app.core.dependencies.check_etag).
+"""
+from datetime import date
+import hashlib
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.cache_backend import get_backend
+from app.core.cache_bus import cache_bus
+from app.models.profile import Profile
+
+settings = get_settings()
+
+class FamilyResponseCache:
+    """Response payloads in a cache backend, valid while the family version they were built at is current"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl  # bounds staleness for writes made outside the app
+        self.hits = 0
+        self.misses = 0
+        self._backend = get_backend("responses", max_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def version(self, family_id: int) -> int:
+        return self._backend.counter(f"family-{family_id}")
+
+    def bump(self, family_id: int, broadcast: bool = True):
+        """Invalidate every cached response of the family"""
+        if not family_id:
+            return
+        self._backend.incr(f"family-{family_id}")
+        if broadcast and not self._backend.shared:
+            cache_bus.publish("families", family_id)
+
+    def etag(self, family_id: int, *parts) -> str:
+        """
+        Strong ETag for a family-scoped response at the current family version
+
+        `parts` identify the response (user, path and query). The day is mixed
+        in for date-relative views, and the TTL window so that writes made
+        outside the app show up within RESPONSE_CACHE_TTL_SECONDS. Versions
+        start over with the backend, so its instance id is mixed in too.
+        """
+        window = int(time.time() // self.ttl) if self.ttl > 0 else 0
+        key = ":".join(map(str, (
+            self._backend.instance_id, family_id, self.version(family_id), date.today(), window, *parts
+        )))
+        return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+    def get(self, family_id: int, endpoint: str, role, user_id: int = None):
+        entry = self._backend.get(_key(family_id, endpoint, role, user_id))
+        if entry is None or entry[0] != self.version(family_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, family_id: int, endpoint: str, role, payload, version: int, user_id: int = None):
+        """Cache `payload` as built at family `version` (read before querying); returns it"""
+        if not self.enabled or not family_id:
+            return payload
+        self._backend.set(_key(family_id, endpoint, role, user_id), (version, payload), self.ttl)
+        return payload
+
+    def clear(self):
+        self._backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__,
+            "size": len(self._backend),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def _key(family_id: int, endpoint: str, role, user_id) -> str:
+    return f"{family_id}:{endpoint}:{role}:{user_id}"
+
+
+family_responses = FamilyResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+cache_bus.subscribe("families", lambda family_id: family_responses.bump(family_id, broadcast=False))
+
+
+# ==============================================================================
+# PROFILE CHANGES (member and children listings show points, themes, logins)
+# ==============================================================================
+
+_PENDING_KEY = "family_responses_pending"
+
+
+def _profiles_flushed(session, flush_context):
+    family_ids = {
+        instance.family_id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, Profile) and instance.family_id
+    }
+    for family_id in family_ids:
+        family_responses.bump(family_id)
+    if family_ids:
+        session.info.setdefault(_PENDING_KEY, set()).update(family_ids)
+
+
+def _transaction_ended(session):
+    # Again once the change is visible to other sessions
+    for family_id in session.info.pop(_PENDING_KEY, ()):
+        family_responses.bump(family_id)
+
+
+def _rolled_back(session, previous_transaction):
+    _transaction_ended(session)
+
+
+event.listen(Session, "after_flush", _profiles_flushed)
+event.listen(Session, "after_commit", _transaction_ended)
+event.listen(Session, "after_soft_rollback", _rolled_back)
@@ -0,0 +1,269 @@
+"""
+Daily completion rollups: the write-maintained aggregates behind analytics
+
+completion_rollups holds the task count and points per (child, date, period,
+category). Completing, uncompleting and approving a task adjust the matching
+row in the same transaction that adds or removes the TaskCompletion:
+
+    db.add(completion)
+    await record_completion(db, completion)
+    ...
+    await record_completion(db, completion, sign=-1)
+    await db.delete(completion)
+
+completion_summary() reads rollups for every day before today and raw
+completions for today, the rows still being written, so a year view reads at
+most 365 × periods × categories rows per child, and groups them into every
+breakdown in SQL (GROUPING SETS on Postgres, UNION ALL of GROUP BYs on
+SQLite). Archived months keep their rollups. rebuild_rollups() recomputes a
+date range from completions and archive files (migration 0005,
+scripts/backfill_rollups.py).
+completion_series() returns zero-filled daily series for several children at
+once, joining the same rows to a generated date series.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import (
+    Date, and_, cast, delete, func, literal, literal_column, null, select, true, tuple_, type_coerce,
+    union_all
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.archive import archived_rollups
+from app.core.partitions import completions_source, completions_source_sync
+from app.models.completion_rollup import CompletionRollup
+from app.models.profile import Profile, UserRole
+
+# Rows per multi-row upsert when rebuilding
+UPSERT_BATCH = 500
+
+
+def _upsert(dialect_name: str, rows: list):
+    """INSERT ... ON CONFLICT that adds tasks and points to an existing row"""
+    table = CompletionRollup.__table__
+    insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+    statement = insert(table).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.child_id, table.c.date, table.c.task_period, table.c.task_category],
+        set_={
+            "tasks": table.c.tasks + statement.excluded.tasks,
+            "points": table.c.points + statement.excluded.points,
+        }
+    )
+
+
+async def record_completion(db, completion, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) a TaskCompletion from its rollup; call before the commit"""
+    await db.execute(_upsert(db.bind.dialect.name, [{
+        "child_id": completion.child_id,
+        "family_id": completion.family_id,
+        "date": completion.completion_date,
+        "task_period": completion.task_period,
+        "task_category": completion.task_category,
+        "tasks": sign,
+        "points": sign * completion.points_earned,
+    }]))
+
+
+async def completion_summary(
+    db,
+    start_date: date,
+    end_date: date,
+    child_id: int = None,
+    family_id: int = None,
+    breakdowns: tuple = ("by_period", "by_category", "by_day", "by_child")
+) -> dict:
+    """
+    Completion totals for one child or family over the range
+
+    Returns {"tasks", "points"} plus the requested breakdowns, each mapping a
+    period, category, date or child id to {"tasks", "points"}. All of them
+    come from one statement that returns only aggregate rows.
+    """
+    summary = {"tasks": 0, "points": 0, **{breakdown: {} for breakdown in breakdowns}}
+    days = await _completion_days(db, start_date, end_date, child_id, family_id)
+    if days is None:
+        return summary
+
+    keys = [days.c[_BREAKDOWN_COLUMNS[breakdown]] for breakdown in breakdowns]
+    totals = [func.sum(days.c.tasks).label("tasks"), func.sum(days.c.points).label("points")]
+
+    # Rows carry the key of the breakdown they belong to; the others (all, for the grand total) are NULL
+    if db.bind.dialect.name == "postgresql":
+        query = select(*keys, *totals).group_by(func.grouping_sets(*[tuple_(key) for key in keys], tuple_()))
+    else:
+        query = union_all(*[
+            select(*[
+                key if key is grouped else type_coerce(null(), key.type).label(key.name) for key in keys
+            ], *totals).group_by(*([grouped] if grouped is not None else []))
+            for grouped in [*keys, None]
+        ])
+    result = await db.execute(query)
+
+    for row in result.all():
+        # Postgres sums bigints as numeric
+        tasks, points = int(row[-2] or 0), int(row[-1] or 0)
+        for breakdown, key in zip(breakdowns, row):
+            if key is not None:
+                summary[breakdown][key] = {"tasks": tasks, "points": points}
+                break
+        else:
+            summary["tasks"], summary["points"] = tasks, points
+    return summary
+
+
+_BREAKDOWN_COLUMNS = {"by_period": "task_period", "by_category": "task_category", "by_day": "date", "by_child": "child_id"}
+
+
+async def completion_series(
+    db, start_date: date, end_date: date, family_id: int, child_ids: list = None
+) -> list:
+    """
+    Daily tasks and points for children of a family, zero-filled, from one statement
+
+    Returns (child_id, first_name, last_name, date, tasks, points) rows ordered
+    by child and date, for `child_ids` or else every child in the family. Ids
+    outside the family are simply missing.
+    """
+    days = await _completion_days(db, start_date, end_date, family_id=family_id)
+    if days is None:
+        return []
+
+    children = select(Profile.id, Profile.first_name, Profile.last_name).filter(Profile.family_id == family_id)
+    if child_ids is not None:
+        children = children.filter(Profile.id.in_(child_ids))
+    else:
+        children = children.filter(Profile.role == UserRole.CHILD)
+    children = children.subquery("children")
+    dates = _date_series(db.bind.dialect.name, start_date, end_date)
+
+    result = await db.execute(
+        select(
+            children.c.id.label("child_id"),
+            children.c.first_name,
+            children.c.last_name,
+            dates.c.date,
+            func.coalesce(func.sum(days.c.tasks), 0).label("tasks"),
+            func.coalesce(func.sum(days.c.points), 0).label("points")
+        ).select_from(
+            children.join(dates, true()).outerjoin(
+                days, and_(days.c.child_id == children.c.id, days.c.date == dates.c.date)
+            )
+        ).group_by(
+            children.c.id, children.c.first_name, children.c.last_name, dates.c.date
+        ).order_by(children.c.id, dates.c.date)
+    )
+    return result.all()
+
+
+def _date_series(dialect_name: str, start_date: date, end_date: date):
+    """CTE with one `date` row per day of the range"""
+    if dialect_name == "postgresql":
+        # Typed bounds, so asyncpg sends dates rather than guessing timestamps
+        return select(cast(
+            func.generate_series(cast(start_date, Date), cast(end_date, Date), literal_column("interval '1 day'")),
+            Date
+        ).label("date")).cte("dates")
+    dates = select(literal(start_date, Date).label("date")).cte("dates", recursive=True)
+    return dates.union_all(
+        select(type_coerce(func.date(dates.c.date, "+1 day"), Date)).filter(dates.c.date < end_date)
+    )
+
+
+async def _completion_days(db, start_date: date, end_date: date, child_id: int = None, family_id: int = None):
+    """
+    CTE of (child_id, date, task_period, task_category, tasks, points) rows for the range
+
+    One row per rollup before today, plus today's raw completions grouped the
+    same way; None when the range has no days up to today.
+    """
+    today = date.today()
+    branches = []
+    if start_date < today:
+        rollup = CompletionRollup
+        query = select(
+            rollup.child_id, rollup.date, rollup.task_period, rollup.task_category, rollup.tasks, rollup.points
+        ).filter(
+            rollup.date >= start_date,
+            rollup.date <= min(end_date, today - timedelta(days=1)),
+            rollup.tasks > 0
+        )
+        if child_id is not None:
+            query = query.filter(rollup.child_id == child_id)
+        else:
+            query = query.filter(rollup.family_id == family_id)
+        branches.append(query)
+
+    if start_date <= today <= end_date:
+        completions_table = await completions_source(db, today, today)
+        query = select(
+            completions_table.child_id,
+            completions_table.completion_date.label("date"),
+            completions_table.task_period,
+            completions_table.task_category,
+            func.count(completions_table.id).label("tasks"),
+            func.sum(completions_table.points_earned).label("points")
+        ).filter(completions_table.completion_date == today).group_by(
+            completions_table.child_id,
+            completions_table.completion_date,
+            completions_table.task_period,
+            completions_table.task_category
+        )
+        if child_id is not None:
+            query = query.filter(completions_table.child_id == child_id)
+        else:
+            query = query.filter(completions_table.family_id == family_id)
+        branches.append(query)
+
+    if not branches:
+        return None
+    return (union_all(*branches) if len(branches) > 1 else branches[0]).cte("completion_days")
+
+
+def rebuild_rollups(db, start_date: date = None, end_date: date = None) -> int:
+    """
+    Recompute rollups for the range (all history by default) from completions and archive files
+
+    Takes a sync Session and leaves the commit to the caller. Returns the
+    number of rollup rows written.
+    """
+    rollups = CompletionRollup.__table__
+    in_range = []
+    if start_date is not None:
+        in_range.append(rollups.c.date >= start_date)
+    if end_date is not None:
+        in_range.append(rollups.c.date <= end_date)
+    db.execute(delete(rollups).filter(*in_range))
+
+    completions_table = completions_source_sync(db, start_date, end_date)
+    grouped = select(
+        completions_table.child_id,
+        completions_table.family_id,
+        completions_table.completion_date,
+        completions_table.task_period,
+        completions_table.task_category,
+        func.count(completions_table.id),
+        func.sum(completions_table.points_earned)
+    ).group_by(
+        completions_table.child_id,
+        completions_table.family_id,
+        completions_table.completion_date,
+        completions_table.task_period,
+        completions_table.task_category
+    )
+    if start_date is not None:
+        grouped = grouped.filter(completions_table.completion_date >= start_date)
+    if end_date is not None:
+        grouped = grouped.filter(completions_table.completion_date <= end_date)
+    result = db.execute(rollups.insert().from_select(
+        ["child_id", "family_id", "date", "task_period", "task_category", "tasks", "points"], grouped
+    ))
+    written = result.rowcount
+
+    # Late rows can put a day in both the database and an archive file, hence the upsert
+    archived = archived_rollups(start_date, end_date)
+    dialect_name = db.get_bind().dialect.name
+    for batch_start in range(0, len(archived), UPSERT_BATCH):
+        db.execute(_upsert(dialect_name, archived[batch_start:batch_start + UPSERT_BATCH]))
+    return written + len(archived)
@@ -5,10 +5,15 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import hashlib
+import logging
+import time
 from app.config import get_settings
+from app.core.cache_backend import get_backend
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -38,14 +43,67 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Verified JWT claims in a cache backend, keyed by the token's SHA-256 digest
+
+    Entries expire at the token's own `exp`, so a cached token is never
+    accepted for longer than verification would accept it. Only valid
+    tokens are cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._backend = get_backend("tokens", max_size)
+
+    def get(self, digest: str) -> Optional[dict]:
+        claims = self._backend.get(digest)
+        if claims is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(claims)
+
+    def put(self, digest: str, claims: dict):
+        exp = claims.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        ttl = exp - time.time()
+        if ttl > 0:
+            self._backend.set(digest, dict(claims), ttl)
+
+    def clear(self):
+        self._backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self._backend).__name__,
+            "size": len(self._backend),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
-    import logging
-    logger = logging.getLogger(__name__)
+    """Decode and verify a JWT token (verified claims are cached until the token expires)"""
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        logger.info(f"Successfully decoded token, payload: {payload}")
-        return payload
     except JWTError as e:
         logger.error(f"JWTError decoding token: {type(e).__name__}: {e}")
-        return None
\ No newline at end of file
+        return None
+    logger.debug(f"Decoded token for sub={payload.get('sub')}")
+    token_cache.put(digest, payload)
+    return payload
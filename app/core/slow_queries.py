@@ -0,0 +1,117 @@
+"""
+Slow query log: statements over a threshold are logged with their plan
+"""
+from collections import deque
+from datetime import datetime
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.query_counter import get_current_counter, statement_shape
+
+logger = logging.getLogger(__name__)
+
+
+class SlowQueryLog:
+    """Bounded ring buffer of recent slow statements"""
+
+    def __init__(self, threshold_ms: int, size: int = 100, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self, limit: int = None) -> list:
+        """Newest first"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _param_shape(parameters):
+    """Redact bind values, keeping only their types"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _explain(conn, statement, parameters):
+    """Capture the plan for a SELECT on the connection that just ran it"""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+
+    cursor = conn.connection.cursor()
+    # A failed EXPLAIN must not abort the request's Postgres transaction
+    savepoint = dialect == "postgresql" and conn.in_transaction()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception as e:
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cursor.close()
+
+    if dialect == "sqlite":
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+def install_slow_query_log(sync_engine, slow_log: SlowQueryLog, name: str):
+    """Time statements on this engine and record those over the threshold"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _record_if_slow(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_start", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < slow_log.threshold_ms:
+            return
+
+        counter = get_current_counter()
+        route = f"{counter.method} {counter.path}" if counter else None
+        is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        plan = None
+        if slow_log.explain and is_select and not executemany:
+            plan = _explain(conn, statement, parameters)
+
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round(elapsed_ms, 2),
+            "route": route,
+            "engine": name,
+            "statement": statement_shape(statement),
+            "params": _param_shape(parameters[0] if executemany and parameters else parameters),
+            "executemany": executemany,
+            "rowcount": cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None,
+            "plan": plan,
+        }
+        slow_log.add(entry)
+        logger.warning(f"🐢 Slow query {elapsed_ms:.0f}ms on {route or 'background'}: {entry['statement'][:200]}")
@@ -0,0 +1,118 @@
+"""
+Registry of prebuilt statements for the hottest lookups
+
+Each statement is built once at import with bindparam() placeholders and
+shared by every code path that needs it, so requests skip building the ORM
+query and SQLAlchemy finds its compiled form in the compiled cache. On
+Postgres, asyncpg additionally keeps a server-side prepared statement per
+shape (DB_PREPARED_STATEMENT_CACHE_SIZE per connection).
+
+    result = await db.execute(PROFILE_BY_ID, {"user_id": user_id})
+"""
+from collections import Counter
+import threading
+
+from sqlalchemy import bindparam, event, select
+
+from app.database import async_engine, engine, replica_async_engine
+from app.models.daily_progress import DailyProgress
+from app.models.profile import Profile
+from app.models.task import Task
+
+
+class StatementRegistry:
+    """Named prebuilt statements with compiled-cache hit/miss counters"""
+
+    def __init__(self):
+        self._names = {}  # id(statement) -> name
+        self._statements = {}
+        self._stats = {}
+        self._all = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, statement):
+        if name in self._statements:
+            raise ValueError(f"Statement '{name}' is already registered")
+        self._statements[name] = statement
+        self._names[id(statement)] = name
+        self._stats[name] = Counter()
+        return statement
+
+    def record(self, statement, cache_result: str):
+        """Count one execution; `cache_result` is a CacheStats name such as CACHE_HIT"""
+        name = self._names.get(id(statement))
+        with self._lock:
+            self._all[cache_result] += 1
+            if name is not None:
+                self._stats[name][cache_result] += 1
+
+    def reset(self):
+        with self._lock:
+            self._all.clear()
+            for counter in self._stats.values():
+                counter.clear()
+
+    def snapshot(self) -> dict:
+        """Hit/miss counters per registered statement and across all statements"""
+        with self._lock:
+            return {
+                "statements": {name: _summary(counter) for name, counter in self._stats.items()},
+                "all_statements": _summary(self._all),
+            }
+
+
+def _summary(counter: Counter) -> dict:
+    hits = counter["CACHE_HIT"]
+    misses = counter["CACHE_MISS"]
+    return {
+        "executions": sum(counter.values()),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+statements = StatementRegistry()
+
+
+def _record_cache_result(conn, cursor, statement, parameters, context, executemany):
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        statements.record(context.invoked_statement, cache_hit.name)
+
+
+def install_statement_stats(sync_engine):
+    """Count compiled-cache hits and misses on this engine"""
+    if not event.contains(sync_engine, "before_cursor_execute", _record_cache_result):
+        event.listen(sync_engine, "before_cursor_execute", _record_cache_result)
+
+
+# Models import app.database, so engines are instrumented here rather than there
+for counted_engine in (engine, async_engine, replica_async_engine):
+    if counted_engine is not None:
+        install_statement_stats(getattr(counted_engine, "sync_engine", counted_engine))
+
+
+# Current user on every authenticated request (app.core.dependencies)
+PROFILE_BY_ID = statements.register(
+    "profile_by_id",
+    select(Profile).filter(Profile.id == bindparam("user_id"))
+)
+
+# A child's progress row for one day (complete, uncomplete, approve, redeem)
+DAILY_PROGRESS_FOR_DAY = statements.register(
+    "daily_progress_for_day",
+    select(DailyProgress).filter(
+        DailyProgress.child_id == bindparam("child_id"),
+        DailyProgress.date == bindparam("date")
+    )
+)
+
+# A task, scoped to the caller's family
+FAMILY_TASK = statements.register(
+    "family_task",
+    select(Task).filter(
+        Task.id == bindparam("task_id"),
+        Task.family_id == bindparam("family_id")
+    )
+)
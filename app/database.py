@@ -2,25 +2,125 @@
 Database connection and session management
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import logging
 
 from app.config import get_settings
+from app.core.cache_backend import get_backend
+from app.core.cache_bus import cache_bus
+from app.core.pool_stats import instrumented_pool_class, pool_status
+from app.core.query_counter import install_query_counter, enable_strict_loading
+from app.core.slow_queries import SlowQueryLog, install_slow_query_log
 
 settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
-# Create database engine
+# Async drivers used by the request path, keyed by backend name
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(database_url: str):
+    """Translate a sync DATABASE_URL into its async driver equivalent"""
+    url = make_url(database_url.replace("postgres://", "postgresql://", 1))
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    url = url.set(drivername=driver)
+    if driver == "postgresql+asyncpg":
+        # Server-side prepared statements kept per connection, keyed by statement shape
+        url = url.update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)
+        })
+    return url
+
+
+def get_pool_options(url, name: str, async_: bool = False) -> dict:
+    """Pool settings from Settings (in-memory SQLite keeps its single-connection pool)"""
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(name, async_=async_),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+# Create database engine (sync - used by scripts/ and the HTML page routes)
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_pre_ping=True
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    **get_pool_options(make_url(settings.DATABASE_URL), "primary")
+)
+
+# Create async engine (used by the API routers)
+async_url = get_async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    async_url,
+    echo=settings.DEBUG,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    **get_pool_options(async_url, "primary_async", async_=True)
 )
 
-# Create session factory
+# Create replica engine (optional - read-only endpoints only)
+replica_async_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_url = get_async_url(settings.DATABASE_REPLICA_URL)
+    replica_async_engine = create_async_engine(
+        replica_url,
+        echo=settings.DEBUG,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        **get_pool_options(replica_url, "replica_async", async_=True)
+    )
+
+# Count statements per request and log slow ones on every engine
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN
+)
+for engine_name, counted_engine in (
+    ("primary", engine),
+    ("primary_async", async_engine),
+    ("replica_async", replica_async_engine),
+):
+    if counted_engine is None:
+        continue
+    sync_engine = getattr(counted_engine, "sync_engine", counted_engine)
+    install_query_counter(sync_engine)
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        install_slow_query_log(sync_engine, slow_query_log, engine_name)
+
+if settings.DB_RAISE_ON_LAZY_LOAD:
+    enable_strict_loading()
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # Attributes must stay readable after commit without lazy IO
+)
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+) if replica_async_engine is not None else None
+
+# Families that wrote within the read-your-writes window, seen by every worker
+# (shared by the file backend, broadcast over the bus with the memory backend)
+_recent_writes = get_backend("recent_writes", max_size=10000)
 
 # Create base class for models
 Base = declarative_base()
@@ -35,10 +135,74 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def record_write(family_id: int, broadcast: bool = True):
+    """Pin a family's reads to the primary for READ_YOUR_WRITES_SECONDS, in every worker"""
+    if replica_async_engine is None or not family_id:
+        return
+    _recent_writes.prune()
+    _recent_writes.set(str(family_id), True, settings.READ_YOUR_WRITES_SECONDS)
+    if broadcast and not _recent_writes.shared:
+        cache_bus.publish("recent_writes", [family_id])
+
+
+def has_recent_write(family_id: int) -> bool:
+    """True if the family wrote within the read-your-writes window"""
+    return bool(family_id) and _recent_writes.get(str(family_id)) is not None
+
+
+def _remote_writes(family_ids: list):
+    for family_id in family_ids:
+        record_write(family_id, broadcast=False)
+
+
+cache_bus.subscribe("recent_writes", _remote_writes)
+
+
+async def prewarm_pools():
+    """Open DB_POOL_SIZE connections per engine so the first requests don't pay connect cost"""
+    if not settings.DB_POOL_PREWARM:
+        return
+
+    sync_connections = [engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+    for connection in sync_connections:
+        connection.close()
+
+    for pool_engine in (async_engine, replica_async_engine):
+        if pool_engine is None:
+            continue
+        async_connections = [await pool_engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+        for connection in async_connections:
+            await connection.close()
+
+    logger.info(f"🔥 Pre-warmed {settings.DB_POOL_SIZE} connections per pool")
+
+
+def get_pool_statuses() -> list:
+    """Live status of every engine's connection pool"""
+    statuses = [
+        pool_status("primary", engine.pool),
+        pool_status("primary_async", async_engine.sync_engine.pool),
+    ]
+    if replica_async_engine is not None:
+        statuses.append(pool_status("replica_async", replica_async_engine.sync_engine.pool))
+    return statuses
+
+
 def init_db():
     """Initialize database tables"""
     # Import all models here to ensure they're registered
     from app import models  # noqa: F401
 
+    from app.migrations import run_migrations
+    from app.core.partitions import ensure_partitions
+
     Base.metadata.create_all(bind=engine)
-    logger.info("✅ Database tables created")
\ No newline at end of file
+    logger.info("✅ Database tables created")
+    run_migrations(engine)
+    ensure_partitions(engine)
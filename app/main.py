@@ -9,7 +9,10 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, Base, prewarm_pools
+from app.core.cache_bus import cache_bus
+from app.core.query_counter import QueryCountMiddleware
+from app.core.templating import configure_templates, precompile_templates
 
 # Import all models to ensure they're registered
 from app.models import (
@@ -19,7 +22,7 @@ from app.models import (
 from app.models.task_completion import TaskCompletion
 
 # Import API routers
-from app.api import auth, tasks, approvals, progress, families, rewards, analytics
+from app.api import auth, tasks, approvals, progress, families, rewards, analytics, admin
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,11 +47,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counting / N+1 warnings
+app.add_middleware(QueryCountMiddleware, threshold=settings.N_PLUS_ONE_THRESHOLD)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Templates
 templates = Jinja2Templates(directory="templates")
+configure_templates(templates)
 
 # Include API routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -58,6 +65,7 @@ app.include_router(progress.router, prefix="/api/progress", tags=["progress"])
 app.include_router(families.router, prefix="/api/families", tags=["families"])
 app.include_router(rewards.router, prefix="/api/rewards", tags=["rewards"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 
 @app.on_event("startup")
@@ -66,6 +74,16 @@ async def startup_event():
     logger.info("🚀 Starting Family Task Tracker...")
     logger.info(f"📊 Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'SQLite'}")
     logger.info(f"🌍 Environment: {settings.ENVIRONMENT}")
+    await prewarm_pools()
+    precompile_templates(templates)
+    if settings.CACHE_BACKEND != "file":
+        cache_bus.start(engine)  # per-worker caches: share invalidations
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cleanup on shutdown"""
+    cache_bus.stop()
 
 
 @app.get("/", response_class=HTMLResponse)
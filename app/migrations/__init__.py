@@ -0,0 +1,122 @@
+"""
+Versioned schema migrations
+
+Base.metadata.create_all() only creates missing tables, so changes to existing
+tables (new indexes, backfills) live here. Each module named mNNNN_<name>.py
+defines:
+
+    VERSION: int            - unique, applied in ascending order
+    DESCRIPTION: str
+    TRANSACTIONAL: bool     - False for statements that can't run in a
+                              transaction (CREATE INDEX CONCURRENTLY)
+    def upgrade(conn): ...  - conn is a SQLAlchemy Connection
+
+Migrations must be idempotent: on a fresh database create_all() has usually
+already built what they add.
+"""
+from datetime import datetime
+import importlib
+import logging
+import pkgutil
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key so concurrently starting workers migrate one at a time
+MIGRATION_LOCK_ID = 7236001
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def load_migrations() -> list:
+    """All migration modules in this package, ordered by VERSION"""
+    modules = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("m")
+    ]
+    modules.sort(key=lambda module: module.VERSION)
+    versions = [module.VERSION for module in modules]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return modules
+
+
+def applied_versions(engine) -> set:
+    """Versions already recorded in schema_migrations"""
+    metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine) -> list:
+    """Apply pending migrations; returns the versions applied"""
+    is_postgres = engine.dialect.name == "postgresql"
+    applied = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if is_postgres:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            done = applied_versions(engine)
+            for module in load_migrations():
+                if module.VERSION in done:
+                    continue
+
+                logger.info(f"🔧 Applying migration {module.VERSION}: {module.DESCRIPTION}")
+                if getattr(module, "TRANSACTIONAL", True):
+                    with engine.begin() as conn:
+                        module.upgrade(conn)
+                        _record(conn, module)
+                else:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        module.upgrade(conn)
+                        _record(conn, module)
+                applied.append(module.VERSION)
+        finally:
+            if is_postgres:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+    if applied:
+        logger.info(f"✅ Applied migrations: {applied}")
+    return applied
+
+
+def _record(conn, module):
+    conn.execute(schema_migrations.insert().values(
+        version=module.VERSION,
+        description=module.DESCRIPTION,
+        applied_at=datetime.utcnow()
+    ))
+
+
+def create_index(conn, name: str, table: str, columns: str, include: str = None):
+    """
+    CREATE INDEX IF NOT EXISTS, concurrently on Postgres
+
+    `include` adds covering columns (Postgres only). Run from a
+    non-transactional migration so CONCURRENTLY is allowed.
+    """
+    if conn.dialect.name == "postgresql":
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+        invalid = conn.execute(text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        include_sql = f" INCLUDE ({include})" if include else ""
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){include_sql}"
+        ))
+    else:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
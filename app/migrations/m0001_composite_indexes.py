@@ -0,0 +1,26 @@
+"""
+Composite indexes matching the analytics, approval and family queries
+"""
+from app.migrations import create_index
+
+VERSION = 1
+DESCRIPTION = "Composite indexes for completions, approvals, profiles, daily progress"
+TRANSACTIONAL = False  # CREATE INDEX CONCURRENTLY
+
+
+def upgrade(conn):
+    # Analytics range scans per child / per family, covering the aggregated columns
+    create_index(
+        conn, "ix_task_completions_child_date", "task_completions",
+        "child_id, completion_date", include="points_earned, task_period, task_category"
+    )
+    create_index(
+        conn, "ix_task_completions_family_date", "task_completions",
+        "family_id, completion_date", include="points_earned, task_period, task_category"
+    )
+    # Pending approval lookups
+    create_index(conn, "ix_task_approvals_status_child", "task_approvals", "status, child_id")
+    # Children / members of a family
+    create_index(conn, "ix_profiles_family_role", "profiles", "family_id, role")
+    # Latest progress per child (streaks, last activity)
+    create_index(conn, "ix_daily_progress_child_date_desc", "daily_progress", "child_id, date DESC")
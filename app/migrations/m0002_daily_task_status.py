@@ -0,0 +1,91 @@
+"""
+Backfill daily_task_status and reward_redemptions from the old JSON columns
+
+daily_progress.completed_task_ids / pending_approval_ids / redeemed_reward_ids
+are no longer mapped. They are left in place (unread) so a rollback to the
+previous release still finds its data; drop them in a later migration.
+
+Plain SQL against the tables as of this version, so later model changes
+can't change what this migration writes.
+"""
+from datetime import datetime
+import json
+
+from sqlalchemy import Date, DateTime, bindparam, inspect, text
+
+VERSION = 2
+DESCRIPTION = "Backfill daily_task_status and reward_redemptions from daily_progress JSON"
+TRANSACTIONAL = True
+
+JSON_COLUMNS = ("completed_task_ids", "pending_approval_ids", "redeemed_reward_ids")
+
+# daily_task_status.state is an Enum column, which stores the member name
+_COMPLETED = "COMPLETED"
+_PENDING_APPROVAL = "PENDING_APPROVAL"
+
+_INSERT_STATUS = text(
+    "INSERT INTO daily_task_status (child_id, date, task_id, state, created_at, updated_at) "
+    "VALUES (:child_id, :date, :task_id, :state, :now, :now)"
+).bindparams(bindparam("date", type_=Date), bindparam("now", type_=DateTime))
+
+_INSERT_REDEMPTION = text(
+    "INSERT INTO reward_redemptions (child_id, date, reward_id, points_spent, redeemed_at) "
+    "VALUES (:child_id, :date, :reward_id, :points_spent, :now)"
+).bindparams(bindparam("date", type_=Date), bindparam("now", type_=DateTime))
+
+
+def _ids(value) -> list:
+    """JSON column value as a list of ints (SQLite hands back the raw string)"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = json.loads(value) or []
+    return [int(item) for item in value]
+
+
+def upgrade(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("daily_progress")}
+    if not set(JSON_COLUMNS) <= columns:
+        return  # Fresh database: nothing to backfill
+
+    task_ids = set(conn.execute(text("SELECT id FROM tasks")).scalars())
+    reward_costs = dict(conn.execute(text("SELECT id, cost FROM rewards")).all())
+
+    rows = conn.execution_options(stream_results=True).execute(
+        text(
+            "SELECT child_id, date, completed_task_ids, pending_approval_ids, redeemed_reward_ids "
+            "FROM daily_progress"
+        ).columns(date=Date)
+    )
+
+    now = datetime.utcnow()
+    statuses = []
+    redemptions = []
+    for row in rows:
+        completed = {task_id for task_id in _ids(row.completed_task_ids) if task_id in task_ids}
+        pending = {task_id for task_id in _ids(row.pending_approval_ids) if task_id in task_ids}
+        # A task approved after being left in pending counts as completed
+        for task_id in sorted(completed):
+            statuses.append({
+                "child_id": row.child_id, "date": row.date, "task_id": task_id, "state": _COMPLETED, "now": now
+            })
+        for task_id in sorted(pending - completed):
+            statuses.append({
+                "child_id": row.child_id, "date": row.date, "task_id": task_id, "state": _PENDING_APPROVAL, "now": now
+            })
+
+        # Repeated ids are repeated redemptions, so keep them
+        for reward_id in _ids(row.redeemed_reward_ids):
+            if reward_id in reward_costs:
+                redemptions.append({
+                    "child_id": row.child_id,
+                    "date": row.date,
+                    "reward_id": reward_id,
+                    "points_spent": reward_costs[reward_id],
+                    "now": now,
+                })
+
+    if statuses:
+        conn.execute(_INSERT_STATUS, statuses)
+    if redemptions:
+        conn.execute(_INSERT_REDEMPTION, redemptions)
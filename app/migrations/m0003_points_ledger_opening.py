@@ -0,0 +1,42 @@
+"""
+Opening ledger entries for balances that predate the points ledger
+
+Each child with points and no ledger history gets one OPENING entry for its
+current total_lifetime_points plus a snapshot at that entry, so the ledger
+sum matches total_lifetime_points from here on.
+
+Plain SQL against the tables as of this version, so later model changes
+can't change what this migration writes.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, bindparam, text
+
+VERSION = 3
+DESCRIPTION = "Opening points ledger entries and snapshots for existing balances"
+TRANSACTIONAL = True
+
+# points_ledger.event is an Enum column, which stores the member name
+_OPENING = "OPENING"
+
+
+def upgrade(conn):
+    now = datetime.utcnow()
+    conn.execute(
+        text(
+            "INSERT INTO points_ledger (child_id, event, delta, date, occurred_at) "
+            "SELECT profiles.id, :event, profiles.total_lifetime_points, :today, :now FROM profiles "
+            "WHERE profiles.total_lifetime_points != 0 "
+            "AND NOT EXISTS (SELECT 1 FROM points_ledger WHERE points_ledger.child_id = profiles.id)"
+        ).bindparams(bindparam("today", type_=Date), bindparam("now", type_=DateTime)),
+        {"event": _OPENING, "today": date.today(), "now": now}
+    )
+    conn.execute(
+        text(
+            "INSERT INTO points_snapshots (child_id, ledger_id, balance, as_of, created_at) "
+            "SELECT points_ledger.child_id, points_ledger.id, points_ledger.delta, points_ledger.occurred_at, :now "
+            "FROM points_ledger WHERE points_ledger.event = :event "
+            "AND NOT EXISTS (SELECT 1 FROM points_snapshots WHERE points_snapshots.child_id = points_ledger.child_id)"
+        ).bindparams(bindparam("now", type_=DateTime)),
+        {"event": _OPENING, "now": now}
+    )
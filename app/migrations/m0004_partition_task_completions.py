@@ -0,0 +1,147 @@
+"""
+Partition task_completions by month
+
+Postgres: the table is rebuilt as PARTITION BY RANGE (completion_date) with
+one partition per month that has data, PARTITION_MONTHS_AHEAD future months
+and a DEFAULT partition. The primary key becomes (id, completion_date) as
+Postgres requires; ids still come from the original sequence.
+
+SQLite: the table is rebuilt with AUTOINCREMENT so ids of rows moved into
+month tables are never handed out again.
+
+The DDL below is the task_completions schema as of this version, written out
+rather than taken from the model, so later model changes can't change what
+this migration creates.
+"""
+from datetime import date
+
+from sqlalchemy import inspect, text
+
+VERSION = 4
+DESCRIPTION = "Partition task_completions by month"
+TRANSACTIONAL = True
+
+_COLUMNS = (
+    "id, child_id, task_id, family_id, task_title, task_category, task_period, points_earned, "
+    "completed_at, completion_date, required_approval"
+)
+
+_FOREIGN_KEYS = [
+    ("child_id", "profiles", "id"),
+    ("task_id", "tasks", "id"),
+    ("family_id", "families", "id"),
+]
+
+# (name, columns, Postgres INCLUDE columns)
+_INDEXES = [
+    ("ix_task_completions_id", "id", None),
+    ("ix_task_completions_child_id", "child_id", None),
+    ("ix_task_completions_family_id", "family_id", None),
+    ("ix_task_completions_completed_at", "completed_at", None),
+    ("ix_task_completions_completion_date", "completion_date", None),
+    ("ix_task_completions_child_date", "child_id, completion_date", "points_earned, task_period, task_category"),
+    ("ix_task_completions_family_date", "family_id, completion_date", "points_earned, task_period, task_category"),
+]
+
+_SQLITE_TABLE = """
+CREATE TABLE task_completions (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    child_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    family_id INTEGER NOT NULL,
+    task_title VARCHAR(200) NOT NULL,
+    task_category VARCHAR(50) NOT NULL,
+    task_period VARCHAR(20) NOT NULL,
+    points_earned INTEGER NOT NULL,
+    completed_at DATETIME NOT NULL,
+    completion_date DATE NOT NULL,
+    required_approval INTEGER,
+    FOREIGN KEY(child_id) REFERENCES profiles (id),
+    FOREIGN KEY(task_id) REFERENCES tasks (id),
+    FOREIGN KEY(family_id) REFERENCES families (id)
+)
+"""
+
+
+def upgrade(conn):
+    if conn.dialect.name == "postgresql":
+        _partition_postgres(conn)
+    elif conn.dialect.name == "sqlite":
+        _autoincrement_sqlite(conn)
+
+
+def _partition_postgres(conn):
+    from app.config import get_settings
+
+    partitioned = conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('task_completions')"
+    )).scalar()
+    if partitioned is True:
+        return
+
+    old = "task_completions_unpartitioned"
+
+    # Free up the index and constraint names for the new parent table
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('task_completions', 'id')")).scalar()
+    conn.execute(text(f"ALTER TABLE task_completions RENAME TO {old}"))
+    conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT task_completions_pkey TO {old}_pkey"))
+    for index in inspect(conn).get_indexes(old):
+        conn.execute(text(f"ALTER INDEX {index['name']} RENAME TO {index['name']}_unpartitioned"))
+
+    conn.execute(text(
+        f"CREATE TABLE task_completions (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (completion_date)"
+    ))
+    conn.execute(text("ALTER TABLE task_completions ADD PRIMARY KEY (id, completion_date)"))
+    for column, referenced_table, referenced_column in _FOREIGN_KEYS:
+        conn.execute(text(
+            f"ALTER TABLE task_completions ADD FOREIGN KEY ({column}) "
+            f"REFERENCES {referenced_table} ({referenced_column})"
+        ))
+    for name, columns, include in _INDEXES:
+        conn.execute(text(
+            f"CREATE INDEX {name} ON task_completions ({columns})" + (f" INCLUDE ({include})" if include else "")
+        ))
+
+    first_day, last_day = conn.execute(text(f"SELECT min(completion_date), max(completion_date) FROM {old}")).one()
+    this_month = date.today().replace(day=1)
+    first_month = first_day.replace(day=1) if first_day else this_month
+    last_month = max(last_day.replace(day=1) if last_day else this_month,
+                     _add_months(this_month, get_settings().PARTITION_MONTHS_AHEAD))
+    month = min(first_month, this_month)
+    while month <= last_month:
+        next_month = _add_months(month, 1)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS task_completions_p{month.year:04d}{month.month:02d} "
+            f"PARTITION OF task_completions FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        ))
+        month = next_month
+    conn.execute(text("CREATE TABLE IF NOT EXISTS task_completions_default PARTITION OF task_completions DEFAULT"))
+
+    conn.execute(text(f"INSERT INTO task_completions ({_COLUMNS}) SELECT {_COLUMNS} FROM {old}"))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY task_completions.id"))
+    conn.execute(text(f"DROP TABLE {old}"))
+
+
+def _autoincrement_sqlite(conn):
+    create_sql = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'task_completions'"
+    )).scalar()
+    if create_sql is None or "AUTOINCREMENT" in create_sql.upper():
+        return
+
+    conn.execute(text("CREATE TABLE task_completions_rebuild AS SELECT * FROM task_completions"))
+    conn.execute(text("DROP TABLE task_completions"))
+    conn.execute(text(_SQLITE_TABLE))
+    for name, columns, _ in _INDEXES:
+        conn.execute(text(f"CREATE INDEX {name} ON task_completions ({columns})"))
+    conn.execute(text(
+        f"INSERT INTO task_completions ({_COLUMNS}) SELECT {_COLUMNS} FROM task_completions_rebuild"
+    ))
+    conn.execute(text("DROP TABLE task_completions_rebuild"))
+
+
+def _add_months(month: date, count: int) -> date:
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
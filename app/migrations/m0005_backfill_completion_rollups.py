@@ -0,0 +1,123 @@
+"""
+Backfill completion_rollups for completions that predate write-maintained rollups
+
+Until now only archived months had rollups. They are rebuilt for all history
+from the live completion tables and the archive files; from here on complete,
+uncomplete and approve keep them current.
+
+Self-contained on purpose: the SQL and the archive reader below are pinned
+to the schema and the TCA1 file format as of this version, so later changes
+to app code can't change what this migration does.
+"""
+from array import array
+from datetime import date
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+
+from sqlalchemy import text
+
+VERSION = 5
+DESCRIPTION = "Backfill completion_rollups from task completions and archive files"
+TRANSACTIONAL = True
+
+# SQLite month tables (task_completions_pYYYYMM) written by migration 0004's scheme
+_SQLITE_PARTITION = re.compile(r"^task_completions_p\d{6}$")
+
+_ARCHIVE_MAGIC = b"TCA1"
+
+_UPSERT = text(
+    "INSERT INTO completion_rollups (child_id, family_id, date, task_period, task_category, tasks, points) "
+    "VALUES (:child_id, :family_id, :date, :task_period, :task_category, :tasks, :points) "
+    "ON CONFLICT (child_id, date, task_period, task_category) DO UPDATE SET "
+    "tasks = completion_rollups.tasks + excluded.tasks, points = completion_rollups.points + excluded.points"
+)
+
+
+def upgrade(conn):
+    conn.execute(text("DELETE FROM completion_rollups"))
+
+    tables = ["task_completions"]
+    if conn.dialect.name == "sqlite":
+        names = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars()
+        tables += sorted(name for name in names if _SQLITE_PARTITION.match(name))
+    source = " UNION ALL ".join(
+        f"SELECT child_id, family_id, completion_date, task_period, task_category, points_earned FROM {table}"
+        for table in tables
+    )
+    conn.execute(text(
+        "INSERT INTO completion_rollups (child_id, family_id, date, task_period, task_category, tasks, points) "
+        "SELECT child_id, family_id, completion_date, task_period, task_category, count(*), sum(points_earned) "
+        f"FROM ({source}) AS completions "
+        "GROUP BY child_id, family_id, completion_date, task_period, task_category"
+    ))
+
+    # Late rows can put a day in both the database and an archive file, hence the upsert
+    rows = _archived_rollups()
+    if rows:
+        conn.execute(_UPSERT, rows)
+
+
+def _archived_rollups() -> list:
+    """Rollup rows for every archive file under ARCHIVE_DIR/family_<id>/<YYYY-MM>.tca"""
+    from app.config import get_settings
+
+    archive_dir = get_settings().ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return []
+
+    totals = {}
+    for family_name in sorted(os.listdir(archive_dir)):
+        if not family_name.startswith("family_"):
+            continue
+        family_id = int(family_name[len("family_"):])
+        family_dir = os.path.join(archive_dir, family_name)
+        for file_name in sorted(os.listdir(family_dir)):
+            if not file_name.endswith(".tca"):
+                continue
+            columns = _read_archive(os.path.join(family_dir, file_name))
+            rows = zip(
+                columns["child_id"], columns["completion_date"], columns["points_earned"],
+                columns["task_period"], columns["task_category"]
+            )
+            for child_id, day, points, task_period, task_category in rows:
+                key = (child_id, day, task_period, task_category)
+                entry = totals.setdefault(key, {"family_id": family_id, "tasks": 0, "points": 0})
+                entry["tasks"] += 1
+                entry["points"] += points
+
+    return [
+        {
+            "child_id": child_id, "family_id": entry["family_id"], "date": date.fromordinal(day).isoformat(),
+            "task_period": task_period, "task_category": task_category,
+            "tasks": entry["tasks"], "points": entry["points"],
+        }
+        for (child_id, day, task_period, task_category), entry in totals.items()
+    ]
+
+
+def _read_archive(path: str) -> dict:
+    """The rollup columns of one TCA1 file, decoded"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != _ARCHIVE_MAGIC:
+        raise ValueError(f"{path} is not a completion archive")
+    (header_length,) = struct.unpack_from("<I", data, 4)
+    data_start = 8 + header_length
+    header = json.loads(data[8:data_start])
+
+    columns = {}
+    for column in ("child_id", "completion_date", "points_earned", "task_period", "task_category"):
+        entry = header["columns"][column]
+        start = data_start + entry["offset"]
+        values = array(entry["type"], zlib.decompress(data[start:start + entry["length"]]))
+        if header["byteorder"] != sys.byteorder:
+            values.byteswap()
+        if "dictionary" in entry:
+            columns[column] = [entry["dictionary"][code] for code in values]
+        else:
+            columns[column] = values.tolist()
+    return columns
@@ -7,6 +7,11 @@ from app.models.daily_progress import DailyProgress
 from app.models.reward import Reward
 from app.models.character_unlock import CharacterUnlock
 from app.models.task_completion import TaskCompletion
+from app.models.completion_rollup import CompletionRollup
+from app.models.daily_task_status import DailyTaskStatus, TaskState
+from app.models.reward_redemption import RewardRedemption
+from app.models.points_ledger import PointsLedgerEntry, LedgerEvent
+from app.models.points_snapshot import PointsSnapshot
 
 __all__ = [
     "Family",
@@ -17,5 +22,12 @@ __all__ = [
     "DailyProgress",
     "Reward",
     "CharacterUnlock",
-    "TaskCompletion"
+    "TaskCompletion",
+    "CompletionRollup",
+    "DailyTaskStatus",
+    "TaskState",
+    "RewardRedemption",
+    "PointsLedgerEntry",
+    "LedgerEvent",
+    "PointsSnapshot"
 ]
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Completion Rollup Model - Daily aggregates of task completions
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index, UniqueConstraint
+
+from app.database import Base
+
+
+class CompletionRollup(Base):
+    """
+    Task count and points per child, day, period and category
+
+    Rows for archived months stay here after their completions move to
+    archive files (see app/core/archive.py).
+    """
+    __tablename__ = "completion_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    family_id = Column(Integer, ForeignKey("families.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    task_period = Column(String(20), nullable=False)
+    task_category = Column(String(50), nullable=False)
+    tasks = Column(Integer, default=0, nullable=False)
+    points = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('child_id', 'date', 'task_period', 'task_category', name='uq_completion_rollups_key'),
+        Index('ix_completion_rollups_family_date', 'family_id', 'date'),
+    )
+
+    def __repr__(self):
+        return f"<CompletionRollup child={self.child_id} {self.date} {self.task_period}/{self.task_category}: {self.tasks}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 
@@ -13,15 +13,14 @@ class DailyProgress(Base):
     child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False, index=True)
     date = Column(Date, default=date.today, nullable=False, index=True)
     total_points = Column(Integer, default=0, nullable=False)
-    completed_task_ids = Column(JSON, default=list)
-    pending_approval_ids = Column(JSON, default=list)
-    redeemed_reward_ids = Column(JSON, default=list)
+    # Per-task state lives in daily_task_status, redemptions in reward_redemptions
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # One progress record per child per day
     __table_args__ = (
         UniqueConstraint('child_id', 'date', name='uq_child_date'),
+        Index('ix_daily_progress_child_date_desc', child_id, date.desc()),
     )
     
     # Relationships
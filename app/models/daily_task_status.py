@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Enum as SQLEnum, UniqueConstraint
+from datetime import datetime, date
+import enum
+
+from app.database import Base
+
+
+class TaskState(str, enum.Enum):
+    """State of a task for one child on one day"""
+    PENDING_APPROVAL = "pending_approval"
+    COMPLETED = "completed"
+
+
+class DailyTaskStatus(Base):
+    """Per-task daily status: one row per (child, date, task) that was completed or submitted"""
+    __tablename__ = "daily_task_status"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    date = Column(Date, default=date.today, nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    state = Column(SQLEnum(TaskState), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # A task is either pending or completed once per child per day;
+    # the unique index doubles as the (child_id, date) lookup index
+    __table_args__ = (
+        UniqueConstraint('child_id', 'date', 'task_id', name='uq_child_date_task'),
+    )
+    
+    def __repr__(self):
+        return f"<DailyTaskStatus child={self.child_id} date={self.date} task={self.task_id} {self.state.value}>"
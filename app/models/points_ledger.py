@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Enum as SQLEnum, Index
+from datetime import datetime, date
+import enum
+
+from app.database import Base
+
+
+class LedgerEvent(str, enum.Enum):
+    """Why a child's points balance changed"""
+    OPENING = "opening"  # balance carried over from before the ledger existed
+    EARN = "earn"
+    UNDO = "undo"
+    SPEND = "spend"
+
+
+class PointsLedgerEntry(Base):
+    """Append-only record of every change to a child's points balance"""
+    __tablename__ = "points_ledger"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    event = Column(SQLEnum(LedgerEvent), nullable=False)
+    delta = Column(Integer, nullable=False)  # signed: negative for undo/spend
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"))
+    reward_id = Column(Integer, ForeignKey("rewards.id", ondelete="SET NULL"))
+    date = Column(Date, default=date.today, nullable=False)  # day the points count towards
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Tail scans after a snapshot and time-bounded history per child
+    __table_args__ = (
+        Index('ix_points_ledger_child_entry', 'child_id', 'id'),
+        Index('ix_points_ledger_child_occurred', 'child_id', 'occurred_at'),
+    )
+    
+    def __repr__(self):
+        return f"<PointsLedgerEntry child={self.child_id} {self.event.value} {self.delta:+d}>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from datetime import datetime
+
+from app.database import Base
+
+
+class PointsSnapshot(Base):
+    """A child's balance as of one ledger entry, so balances replay only the tail after it"""
+    __tablename__ = "points_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    ledger_id = Column(Integer, ForeignKey("points_ledger.id"), nullable=False)  # last entry included
+    balance = Column(Integer, nullable=False)
+    as_of = Column(DateTime, nullable=False)  # occurred_at of that entry
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_points_snapshots_child_ledger', 'child_id', 'ledger_id'),
+        Index('ix_points_snapshots_child_as_of', 'child_id', 'as_of'),
+    )
+    
+    def __repr__(self):
+        return f"<PointsSnapshot child={self.child_id} ledger={self.ledger_id} balance={self.balance}>"
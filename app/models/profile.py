@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum, Boolean, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -38,6 +38,10 @@ class Profile(Base):
     last_login = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_profiles_family_role', 'family_id', 'role'),
+    )
     
     # Relationships
     family = relationship("Family", back_populates="members", foreign_keys=[family_id])
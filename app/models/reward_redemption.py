@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime, date
+
+from app.database import Base
+
+
+class RewardRedemption(Base):
+    """One reward redeemed by a child (a reward can be redeemed several times a day)"""
+    __tablename__ = "reward_redemptions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    child_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    reward_id = Column(Integer, ForeignKey("rewards.id", ondelete="CASCADE"), nullable=False, index=True)
+    date = Column(Date, default=date.today, nullable=False)
+    points_spent = Column(Integer, nullable=False)
+    redeemed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_reward_redemptions_child_date', 'child_id', 'date'),
+    )
+    
+    # Relationships
+    reward = relationship("Reward")
+    
+    def __repr__(self):
+        return f"<RewardRedemption child={self.child_id} reward={self.reward_id} date={self.date}>"
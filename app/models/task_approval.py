@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 import enum
@@ -27,6 +27,10 @@ class TaskApproval(Base):
     requested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     approved_at = Column(DateTime)
     approved_by = Column(Integer, ForeignKey("profiles.id"))
+
+    __table_args__ = (
+        Index('ix_task_approvals_status_child', 'status', 'child_id'),
+    )
     
     # Relationships
     task = relationship("Task", back_populates="approvals")
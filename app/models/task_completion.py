@@ -1,7 +1,7 @@
 """
 Task Completion Model - Detailed tracking for analytics
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -33,6 +33,21 @@ class TaskCompletion(Base):
     # Was it approved or instant?
     required_approval = Column(Integer, default=0)  # 1 if required approval
 
+    # Analytics range scans; INCLUDE lets Postgres answer them from the index alone.
+    # On Postgres the table is partitioned by month (migration 0004); on SQLite
+    # ids must never be reused because closed months move to their own tables.
+    __table_args__ = (
+        Index(
+            'ix_task_completions_child_date', 'child_id', 'completion_date',
+            postgresql_include=['points_earned', 'task_period', 'task_category']
+        ),
+        Index(
+            'ix_task_completions_family_date', 'family_id', 'completion_date',
+            postgresql_include=['points_earned', 'task_period', 'task_category']
+        ),
+        {'sqlite_autoincrement': True},
+    )
+
     # Relationships
     child = relationship("Profile", foreign_keys=[child_id])
     task = relationship("Task", foreign_keys=[task_id])
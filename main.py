@@ -12,8 +12,12 @@ from sqlalchemy.orm import Session
 import logging
 
 from app.config import get_settings
-from app.database import get_db, init_db
+from app.database import engine, get_db, init_db, prewarm_pools
+from app.core.cache_bus import cache_bus
 from app.core.dependencies import get_current_user as get_current_user_from_cookie
+from app.core.profile_cache import ProfileSnapshot
+from app.core.query_counter import QueryCountMiddleware
+from app.core.templating import configure_templates, precompile_templates
 
 # Import all models to ensure they're registered with SQLAlchemy
 from app.models import (
@@ -22,7 +26,7 @@ from app.models import (
 )
 
 # Import API routers
-from app.api import auth, tasks, approvals, progress, families, rewards, characters
+from app.api import auth, tasks, approvals, progress, families, rewards, characters, admin
 
 # Get settings instance
 settings = get_settings()
@@ -52,15 +56,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counting / N+1 warnings
+app.add_middleware(QueryCountMiddleware, threshold=settings.N_PLUS_ONE_THRESHOLD)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Templates
 templates = Jinja2Templates(directory="templates")
-# Auto-reload templates in development only
-if settings.DEBUG:
-    templates.env.auto_reload = True
-    templates.env.cache = None
+# Bytecode cache; auto-reload templates in development only
+configure_templates(templates)
 
 # Add custom template filters
 def format_points(value):
@@ -90,6 +95,7 @@ app.include_router(progress.router, prefix="/api/progress", tags=["Progress"])
 app.include_router(families.router, prefix="/api/families", tags=["Families"])
 app.include_router(rewards.router, prefix="/api/rewards", tags=["Rewards"])
 app.include_router(characters.router, prefix="/api/characters", tags=["Characters"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 # ==============================================================================
@@ -104,15 +110,20 @@ async def startup_event():
     try:
         init_db()
         logger.info("✅ Database initialized")
+        await prewarm_pools()
     except Exception as e:
         logger.error(f"❌ Database initialization failed: {e}")
         raise
+    precompile_templates(templates)
+    if settings.CACHE_BACKEND != "file":
+        cache_bus.start(engine)  # per-worker caches: share invalidations
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("👋 Shutting down application")
+    cache_bus.stop()
 
 
 # ==============================================================================
@@ -157,7 +168,7 @@ async def internal_error_handler(request: Request, exc: Exception):
 @app.get("/", response_class=HTMLResponse)
 async def root(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie)
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie)
 ):
     """Home page - redirect based on auth status"""
     if current_user:
@@ -173,7 +184,7 @@ async def root(
 @app.get("/auth/login", response_class=HTMLResponse)
 async def login_page(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie)
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie)
 ):
     """Login page"""
     if current_user:
@@ -188,7 +199,7 @@ async def login_page(
 @app.get("/auth/register", response_class=HTMLResponse)
 async def register_page(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie)
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie)
 ):
     """Registration page"""
     if current_user:
@@ -215,7 +226,7 @@ async def logout():
 @app.get("/parent/dashboard", response_class=HTMLResponse)
 async def parent_dashboard(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie),
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Parent dashboard"""
@@ -254,7 +265,7 @@ async def parent_dashboard(
 @app.get("/parent/task-library", response_class=HTMLResponse)
 async def task_library(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie),
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Browse and add tasks from library"""
@@ -292,7 +303,7 @@ async def task_library(
 @app.get("/parent/approval-queue", response_class=HTMLResponse)
 async def approval_queue(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie),
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """View pending approval requests"""
@@ -330,7 +341,7 @@ async def approval_queue(
 @app.get("/child/dashboard", response_class=HTMLResponse)
 async def child_dashboard(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie),
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Child dashboard with tasks"""
@@ -340,6 +351,7 @@ async def child_dashboard(
     # Get today's progress
     from datetime import date
     from app.models.daily_progress import DailyProgress
+    from app.models.daily_task_status import DailyTaskStatus, TaskState
     from app.models.task import Task
     from app.models.task_assignment import TaskAssignment
     
@@ -353,13 +365,19 @@ async def child_dashboard(
         progress = DailyProgress(
             child_id=current_user.id,
             date=today,
-            total_points=0,
-            completed_task_ids=[],
-            pending_approval_ids=[]
+            total_points=0
         )
         db.add(progress)
         db.commit()
     
+    # Get today's task states
+    statuses = db.query(DailyTaskStatus).filter(
+        DailyTaskStatus.child_id == current_user.id,
+        DailyTaskStatus.date == today
+    ).all()
+    completed_ids = [s.task_id for s in statuses if s.state == TaskState.COMPLETED]
+    pending_ids = [s.task_id for s in statuses if s.state == TaskState.PENDING_APPROVAL]
+    
     # Get assigned tasks
     assigned_tasks = db.query(Task).join(TaskAssignment).filter(
         TaskAssignment.child_id == current_user.id,
@@ -380,8 +398,8 @@ async def child_dashboard(
             "morning_tasks": morning_tasks,
             "evening_tasks": evening_tasks,
             "anytime_tasks": anytime_tasks,
-            "completed_ids": progress.completed_task_ids or [],
-            "pending_ids": progress.pending_approval_ids or []
+            "completed_ids": completed_ids,
+            "pending_ids": pending_ids
         }
     )
 
@@ -389,7 +407,7 @@ async def child_dashboard(
 @app.get("/child/rewards", response_class=HTMLResponse)
 async def child_rewards(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie),
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """View rewards catalog"""
@@ -429,7 +447,7 @@ async def child_rewards(
 @app.get("/child/profile", response_class=HTMLResponse)
 async def child_profile(
     request: Request,
-    current_user: Profile = Depends(get_current_user_from_cookie)
+    current_user: ProfileSnapshot = Depends(get_current_user_from_cookie)
 ):
     """Child profile and theme settings"""
     if not current_user:
@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.core.archive import archive_completions
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def main():
+    """Move task completions from whole months older than --days into archive files"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        archived = archive_completions(db, args.days)
+        logger.info(f"✅ Archived {archived} completions into {settings.ARCHIVE_DIR}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Archiving failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.core.rollups import rebuild_rollups
+from datetime import date
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Rebuild completion rollups from task completions and archive files (all history by default)"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--start", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, args.start, args.end)
+        db.commit()
+        logger.info(f"✅ Rebuilt {written} completion rollups")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Rollup rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
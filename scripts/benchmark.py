@@ -0,0 +1,291 @@
+"""
+Endpoint benchmarks with stored baselines
+
+    python scripts/generate_data.py --families 50 --children 3 --years 2
+    python scripts/benchmark.py --save                 # record benchmarks/baseline.json
+    python scripts/benchmark.py                        # compare, exit 1 on regression
+
+Runs the app in-process (TestClient) against whatever DATABASE_URL points at,
+as one parent and one child of --family-id (default: the first family with a
+child). Each endpoint is timed over --requests calls after --warmup calls,
+then sampled again under tracemalloc for allocations. The complete endpoint
+is undone after every call (untimed), so the dataset gains ledger rows but
+no completions; still, run it against a throwaway database.
+
+A run fails when p50/p95/p99 or peak allocations of any endpoint grow by more
+than --max-regression over the baseline (latencies must also grow by at least
+--min-delta-ms, so sub-millisecond noise doesn't fail runs), and when any
+endpoint issues more SQL statements per request than it did in the baseline.
+Query counts (the X-Query-Count header; the highest seen, so cache misses
+count) don't depend on timing noise, and they shouldn't depend on the data
+either: a baseline saved on a small dataset also gates a large one, which
+catches per-row lazy loads and other N+1 patterns that only show as latency
+once families and histories grow.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Statement echo and EXPLAIN capture would dominate the timings
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from datetime import datetime
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.security import create_access_token
+from app.database import SessionLocal, engine
+from app.models import Family, Profile, Task, TaskAssignment, TaskCompletion
+from app.models.profile import UserRole
+
+# The app logs at INFO on every request; keep that out of the measurements
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+# name -> (client, method, path); paths are formatted with the dataset ids
+ENDPOINTS = {
+    "my_tasks": ("child", "GET", "/api/tasks/my-tasks"),
+    "complete_task": ("child", "POST", "/api/tasks/{task_id}/complete"),
+    "approvals": ("parent", "GET", "/api/approvals/"),
+    "analytics_child_year": ("parent", "GET", "/api/analytics/child/{child_id}?period=year"),
+    "analytics_family": ("parent", "GET", "/api/analytics/family"),
+    "analytics_trends_family": ("parent", "GET", "/api/analytics/trends?days=90"),
+    "progress_stats_all": ("child", "GET", "/api/progress/stats?period=all"),
+    "children_stats": ("parent", "GET", "/api/auth/children/stats"),
+}
+
+# Untimed call after each request, so the next one starts from the same state
+RESETS = {
+    "complete_task": ("child", "POST", "/api/tasks/{task_id}/uncomplete"),
+}
+
+GATED_METRICS = ["p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib"]
+
+
+def load_app():
+    """The deployed app, with the analytics router mounted if main.py doesn't include it"""
+    import main
+    from app.api import analytics
+
+    if not any(getattr(route, "path", "").startswith("/api/analytics") for route in main.app.routes):
+        main.app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+    return main.app
+
+
+def pick_dataset(family_id: int = None) -> dict:
+    """Ids used in the benchmarked requests"""
+    db = SessionLocal()
+    try:
+        if family_id is None:
+            family_id = db.scalar(select(func.min(Profile.family_id)).filter(Profile.role == UserRole.CHILD))
+        if family_id is None:
+            raise RuntimeError("No family with a child; run scripts/generate_data.py first")
+
+        parent_id = db.scalar(select(func.min(Profile.id)).filter(
+            Profile.family_id == family_id, Profile.role == UserRole.PARENT
+        ))
+        child_id = db.scalar(select(func.min(Profile.id)).filter(
+            Profile.family_id == family_id, Profile.role == UserRole.CHILD
+        ))
+        task_id = db.scalar(select(func.min(Task.id)).join(
+            TaskAssignment, TaskAssignment.task_id == Task.id
+        ).filter(
+            TaskAssignment.child_id == child_id,
+            Task.is_active == 1,
+            Task.requires_approval == 0
+        ))
+        if parent_id is None or child_id is None or task_id is None:
+            raise RuntimeError(f"Family {family_id} needs a parent, a child and an assigned task without approval")
+
+        return {"family_id": family_id, "parent_id": parent_id, "child_id": child_id, "task_id": task_id}
+    finally:
+        db.close()
+
+
+def dataset_sizes() -> dict:
+    """Row counts recorded with the results (taken after the run, once resets have settled)"""
+    db = SessionLocal()
+    try:
+        return {
+            "families": db.scalar(select(func.count(Family.id))),
+            "profiles": db.scalar(select(func.count(Profile.id))),
+            # Live rows only; SQLite month tables and archives aren't counted
+            "task_completions": db.scalar(select(func.count(TaskCompletion.id))),
+        }
+    finally:
+        db.close()
+
+
+def _call(clients: dict, spec: tuple, ids: dict):
+    client, method, path = spec
+    return clients[client].request(method, path.format(**ids))
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    """Linear interpolation between closest ranks"""
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_endpoint(clients: dict, name: str, ids: dict, requests: int, warmup: int, alloc_samples: int) -> dict:
+    """Time one endpoint; returns latency percentiles (ms), peak allocation (KiB) and SQL statements per request"""
+    spec = ENDPOINTS[name]
+    reset = RESETS.get(name)
+    if reset:
+        _call(clients, reset, ids)  # e.g. the task may already be done today
+
+    queries = []
+
+    def once():
+        start = time.perf_counter()
+        response = _call(clients, spec, ids)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+        queries.append(int(response.headers.get("X-Query-Count", 0)))
+        if reset:
+            _call(clients, reset, ids)
+        return elapsed
+
+    for _ in range(warmup):
+        once()
+    timings = sorted(once() * 1000 for _ in range(requests))
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_samples):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            once()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(peak - baseline, 0))
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "p50_ms": round(_percentile(timings, 0.50), 3),
+        "p95_ms": round(_percentile(timings, 0.95), 3),
+        "p99_ms": round(_percentile(timings, 0.99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "alloc_peak_kib": round(statistics.median(peaks) / 1024, 1) if peaks else None,
+        "queries": max(queries),
+    }
+
+
+def compare(baseline: dict, results: dict, max_regression: float, min_delta_ms: float) -> list:
+    """Regressions of `results` against `baseline`, as human-readable lines"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        for metric in GATED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if metric.endswith("_ms") and new - old < min_delta_ms:
+                continue
+            change = new / old - 1
+            if change > max_regression:
+                regressions.append(f"{name} {metric}: {old} -> {new} (+{change:.0%})")
+        # Statement counts are exact, so any growth fails
+        old, new = previous.get("queries"), current.get("queries")
+        if old is not None and new is not None and new > old:
+            regressions.append(f"{name} queries: {old} -> {new}")
+    return regressions
+
+
+def main():
+    """Benchmark the hot API endpoints and compare against a stored baseline"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint first")
+    parser.add_argument("--alloc-samples", type=int, default=20, help="requests measured under tracemalloc")
+    parser.add_argument("--family-id", type=int, help="family to act as (default: first with a child)")
+    parser.add_argument("--only", action="append", choices=sorted(ENDPOINTS), help="benchmark only these")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare with or save")
+    parser.add_argument("--save", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="allowed growth, 0.20 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency growth below this")
+    args = parser.parse_args()
+
+    ids = pick_dataset(args.family_id)
+    app = load_app()
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "dataset": ids,
+        "endpoints": {},
+    }
+
+    with TestClient(app) as parent, TestClient(app) as child:
+        parent.cookies.set("access_token", create_access_token(data={"sub": ids["parent_id"]}))
+        child.cookies.set("access_token", create_access_token(data={"sub": ids["child_id"]}))
+        clients = {"parent": parent, "child": child}
+
+        for name in args.only or ENDPOINTS:
+            result = run_endpoint(clients, name, ids, args.requests, args.warmup, args.alloc_samples)
+            results["endpoints"][name] = result
+            logger.info(
+                f"⏱️ {name:<22} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                f"p99 {result['p99_ms']:>8.2f} ms  alloc {result['alloc_peak_kib']} KiB  queries {result['queries']}"
+            )
+
+    results["dataset"]["sizes"] = dataset_sizes()
+    if args.output:
+        _write_json(args.output, results)
+
+    if args.save:
+        _write_json(args.baseline, results)
+        logger.info(f"✅ Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        logger.warning(f"⚠️ No baseline at {args.baseline}; run with --save to record one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("database") != results["database"] or baseline.get("dataset") != results["dataset"]:
+        logger.warning("⚠️ Baseline was recorded on a different database or dataset; only query counts compare meaningfully")
+
+    regressions = compare(baseline, results, args.max_regression, args.min_delta_ms)
+    if regressions:
+        for line in regressions:
+            logger.error(f"❌ Regression: {line}")
+        sys.exit(1)
+    logger.info(f"✅ No regressions over {args.max_regression:.0%} against {args.baseline}")
+
+
+def _write_json(path: str, data: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, default=str)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Synthetic data generator for load and analytics testing
+
+    python scripts/generate_data.py --families 200 --children 3 --years 3 --workers 8
+
+Creates families (one parent, N children, the seed task library and rewards)
+and simulates daily activity for each child over the history window:
+task completions, daily progress, task approvals, daily task status and
+character unlocks. Profiles end with matching points and streaks, each
+child gets an opening points-ledger entry for its total, and completion
+rollups are rebuilt for the window.
+
+Families are simulated in parallel worker processes. On Postgres each worker
+loads its own rows with COPY; SQLite allows a single writer, so workers only
+generate and the main process inserts with executemany.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Bulk loads would flood the statement echo and the slow query log
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from datetime import date, datetime, time, timedelta
+from multiprocessing import Pool
+import argparse
+import csv
+import enum
+import io
+import logging
+import random
+
+from sqlalchemy import bindparam, create_engine, func, select, text, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.core.partitions import create_month_partitions, ensure_partitions, is_partitioned, month_start
+from app.core.rollups import rebuild_rollups
+from app.core.security import get_password_hash
+from app.database import engine, init_db
+from app.models import (
+    CharacterUnlock, DailyProgress, DailyTaskStatus, Family, LedgerEvent, PointsLedgerEntry,
+    PointsSnapshot, Profile, Reward, Task, TaskApproval, TaskAssignment, TaskCompletion, TaskState
+)
+from app.models.profile import UserRole
+from app.models.reward import RewardType
+from app.models.task import TaskCategory, TaskDayType, TaskPeriod
+from app.models.task_approval import ApprovalStatus
+from seed_data import SAMPLE_REWARDS, TASK_LIBRARY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+THEMES = ["minecraft", "mario", "barbie", "sports", "default"]
+FIRST_NAMES = ["Ava", "Leo", "Mia", "Noah", "Zoe", "Eli", "Ivy", "Max", "Lila", "Owen", "Nora", "Finn"]
+
+# Requirement -> character unlocked when a child first meets it
+UNLOCK_MILESTONES = ["streak_3", "points_250", "streak_7", "points_1000", "tasks_100", "streak_30", "points_5000"]
+
+# Hour of day a task in each period is typically done
+PERIOD_HOURS = {TaskPeriod.MORNING: 7, TaskPeriod.EVENING: 19, TaskPeriod.ANYTIME: 15}
+
+# Tables with ids assigned here (their Postgres sequences are advanced afterwards)
+SETUP_TABLES = [Family.__table__, Profile.__table__, Task.__table__, TaskAssignment.__table__, Reward.__table__]
+
+# Tables filled by the simulation, in insert order
+ACTIVITY_TABLES = [
+    TaskCompletion.__table__,
+    DailyProgress.__table__,
+    DailyTaskStatus.__table__,
+    TaskApproval.__table__,
+    CharacterUnlock.__table__,
+]
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLEnum columns store member names
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def bulk_insert(conn, table, rows: list):
+    """COPY rows into `table` on Postgres, executemany elsewhere; rows are dicts with the same keys"""
+    if not rows:
+        return
+    if conn.dialect.name != "postgresql":
+        conn.execute(table.insert(), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def build_families(conn, families: int, children: int, seed: int) -> list:
+    """Insert families, profiles, tasks, assignments and rewards; returns one simulation job per family"""
+    rng = random.Random(seed)
+    next_ids = {
+        table.name: (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+        for table in SETUP_TABLES
+    }
+
+    def new_id(table):
+        value = next_ids[table.name]
+        next_ids[table.name] += 1
+        return value
+
+    password_hash = get_password_hash("password")
+    now = datetime.utcnow()
+    rows = {table.name: [] for table in SETUP_TABLES}
+    jobs = []
+
+    library = [(category, task) for category, tasks in TASK_LIBRARY.items() for task in tasks]
+
+    for _ in range(families):
+        family_id = new_id(Family.__table__)
+        parent_id = new_id(Profile.__table__)
+        rows["families"].append({
+            "id": family_id, "name": f"Family {family_id}", "join_code": f"GEN{family_id:09d}",
+            "admin_id": None, "created_at": now
+        })
+        rows["profiles"].append({
+            "id": parent_id, "family_id": family_id, "email": f"parent{parent_id}@generated.test",
+            "password_hash": password_hash, "first_name": "Parent", "last_name": f"Family {family_id}",
+            "role": UserRole.PARENT, "theme": "default", "theme_enabled": False, "current_streak": 0,
+            "longest_streak": 0, "total_lifetime_points": 0, "is_active": 1, "created_at": now
+        })
+
+        child_specs = []
+        for _ in range(children):
+            child_id = new_id(Profile.__table__)
+            theme = rng.choice(THEMES)
+            child_specs.append({"id": child_id, "theme": theme})
+            rows["profiles"].append({
+                "id": child_id, "family_id": family_id, "email": f"child{child_id}@generated.test",
+                "password_hash": password_hash, "first_name": rng.choice(FIRST_NAMES),
+                "last_name": f"Family {family_id}", "role": UserRole.CHILD, "theme": theme,
+                "theme_enabled": False, "current_streak": 0, "longest_streak": 0,
+                "total_lifetime_points": 0, "is_active": 1, "created_at": now
+            })
+
+        task_specs = []
+        for library_category, task in library:
+            task_id = new_id(Task.__table__)
+            spec = {
+                "id": task_id,
+                "title": task["title"],
+                "points": task["points"],
+                "period": TaskPeriod[task["period"].upper()],
+                "category": TaskCategory[task["category"].upper()],
+                "day_type": TaskDayType[task["day_type"].upper()],
+                "requires_approval": 1 if task["points"] >= 80 else 0,
+            }
+            task_specs.append(spec)
+            rows["tasks"].append({
+                **spec, "family_id": family_id, "icon": task["icon"], "library_category": library_category,
+                "is_active": 1, "created_at": now
+            })
+            for child in child_specs:
+                rows["task_assignments"].append({
+                    "id": new_id(TaskAssignment.__table__), "task_id": task_id,
+                    "child_id": child["id"], "assigned_at": now
+                })
+
+        for reward in SAMPLE_REWARDS:
+            rows["rewards"].append({
+                "id": new_id(Reward.__table__), "family_id": family_id, "name": reward["name"],
+                "cost": reward["cost"], "icon": reward["icon"], "type": RewardType[reward["type"].upper()],
+                "is_active": 1, "created_at": now
+            })
+
+        jobs.append({
+            "family_id": family_id,
+            "parent_id": parent_id,
+            "children": child_specs,
+            "tasks": task_specs,
+            "seed": seed * 1_000_003 + family_id,
+        })
+
+    for table in SETUP_TABLES:
+        bulk_insert(conn, table, rows[table.name])
+    return jobs
+
+
+def simulate_family(job: dict, start_date: date, end_date: date) -> dict:
+    """Daily activity for every child in one family; returns rows per table and per-child totals"""
+    rng = random.Random(job["seed"])
+    rows = {table.name: [] for table in ACTIVITY_TABLES}
+    totals = {}
+
+    for child in job["children"]:
+        child_id = child["id"]
+        diligence = rng.uniform(0.45, 0.95)
+        points = tasks_done = streak = longest = 0
+        reached = set()
+
+        day = start_date
+        while day <= end_date:
+            is_weekend = day.weekday() >= 5
+            day_points = day_tasks = 0
+
+            for task in job["tasks"]:
+                if task["day_type"] == TaskDayType.WEEKDAY and is_weekend:
+                    continue
+                if task["day_type"] == TaskDayType.WEEKEND and not is_weekend:
+                    continue
+                if rng.random() >= diligence:
+                    continue
+
+                done_at = datetime.combine(day, time(PERIOD_HOURS[task["period"]])) + timedelta(
+                    minutes=rng.randint(0, 180)
+                )
+                if task["requires_approval"]:
+                    if day == end_date:
+                        status = ApprovalStatus.PENDING
+                    else:
+                        status = ApprovalStatus.APPROVED if rng.random() < 0.9 else ApprovalStatus.DENIED
+                    approved = status == ApprovalStatus.APPROVED
+                    rows["task_approvals"].append({
+                        "task_id": task["id"], "child_id": child_id, "date_for": day, "status": status,
+                        "requested_at": done_at,
+                        "approved_at": done_at + timedelta(hours=1) if status != ApprovalStatus.PENDING else None,
+                        "approved_by": job["parent_id"] if status != ApprovalStatus.PENDING else None,
+                    })
+                    if status == ApprovalStatus.PENDING:
+                        rows["daily_task_status"].append({
+                            "child_id": child_id, "date": day, "task_id": task["id"],
+                            "state": TaskState.PENDING_APPROVAL, "created_at": done_at, "updated_at": done_at
+                        })
+                    if not approved:
+                        continue
+
+                rows["task_completions"].append({
+                    "child_id": child_id, "task_id": task["id"], "family_id": job["family_id"],
+                    "task_title": task["title"], "task_category": task["category"].value,
+                    "task_period": task["period"].value, "points_earned": task["points"],
+                    "completed_at": done_at, "completion_date": day,
+                    "required_approval": task["requires_approval"],
+                })
+                rows["daily_task_status"].append({
+                    "child_id": child_id, "date": day, "task_id": task["id"],
+                    "state": TaskState.COMPLETED, "created_at": done_at, "updated_at": done_at
+                })
+                day_points += task["points"]
+                day_tasks += 1
+
+            if day_tasks:
+                rows["daily_progress"].append({
+                    "child_id": child_id, "date": day, "total_points": day_points,
+                    "created_at": datetime.combine(day, time(6)),
+                    "updated_at": datetime.combine(day, time(22)),
+                })
+                streak += 1
+            else:
+                streak = 0
+            points += day_points
+            tasks_done += day_tasks
+            longest = max(longest, streak)
+
+            progress = {"streak": streak, "points": points, "tasks": tasks_done}
+            for requirement in UNLOCK_MILESTONES:
+                kind, value = requirement.split("_")
+                if requirement not in reached and progress[kind] >= int(value):
+                    reached.add(requirement)
+                    rows["character_unlocks"].append({
+                        "child_id": child_id, "character_key": f"{child['theme']}_{requirement}",
+                        "theme_key": child["theme"], "unlocked_at": datetime.combine(day, time(21)),
+                        "unlock_method": requirement,
+                    })
+            day += timedelta(days=1)
+
+        totals[child_id] = {"points": points, "current_streak": streak, "longest_streak": longest}
+
+    return {"rows": rows, "totals": totals}
+
+
+def run_job(args) -> dict:
+    """Worker entry point: simulate one family and, on Postgres, load it with COPY"""
+    job, start_date, end_date = args
+    result = simulate_family(job, start_date, end_date)
+    if not settings.DATABASE_URL.startswith("postgres"):
+        return result
+
+    worker_engine = _worker_engine()
+    with worker_engine.begin() as conn:
+        for table in ACTIVITY_TABLES:
+            bulk_insert(conn, table, result["rows"][table.name])
+    return {"rows": {name: len(rows) for name, rows in result["rows"].items()}, "totals": result["totals"]}
+
+
+_engine = None
+
+
+def _worker_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    return _engine
+
+
+def finish_profiles(conn, totals: dict):
+    """Set points and streaks on children and open their points ledger at that balance"""
+    if not totals:
+        return
+    profiles = Profile.__table__
+    conn.execute(
+        update(profiles).where(profiles.c.id == bindparam("child_id")).values(
+            total_lifetime_points=bindparam("points"),
+            current_streak=bindparam("current_streak"),
+            longest_streak=bindparam("longest_streak"),
+        ),
+        [{"child_id": child_id, **child_totals} for child_id, child_totals in totals.items()]
+    )
+
+    now = datetime.utcnow()
+    ledger = PointsLedgerEntry.__table__
+    bulk_insert(conn, ledger, [
+        {"child_id": child_id, "event": LedgerEvent.OPENING, "delta": child_totals["points"],
+         "date": now.date(), "occurred_at": now}
+        for child_id, child_totals in totals.items() if child_totals["points"]
+    ])
+    opening = conn.execute(select(ledger.c.id, ledger.c.child_id, ledger.c.delta).filter(
+        ledger.c.event == LedgerEvent.OPENING,
+        ledger.c.occurred_at == now
+    )).all()
+    bulk_insert(conn, PointsSnapshot.__table__, [
+        {"child_id": child_id, "ledger_id": ledger_id, "balance": delta, "as_of": now, "created_at": now}
+        for ledger_id, child_id, delta in opening
+    ])
+
+
+def main():
+    """Generate synthetic families and their activity history"""
+    parser = argparse.ArgumentParser(description="Generate synthetic families and their activity history")
+    parser.add_argument("--families", type=int, default=10)
+    parser.add_argument("--children", type=int, default=3, help="children per family")
+    parser.add_argument("--years", type=float, default=1.0, help="years of history ending today")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    init_db()
+    end_date = date.today()
+    start_date = end_date - timedelta(days=int(args.years * 365) - 1)
+    started = datetime.utcnow()
+
+    with engine.begin() as conn:
+        jobs = build_families(conn, args.families, args.children, args.seed)
+        if conn.dialect.name == "postgresql":
+            # Route history into monthly partitions rather than the DEFAULT one
+            if is_partitioned(conn):
+                create_month_partitions(conn, month_start(start_date), month_start(end_date))
+            for table in SETUP_TABLES:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+                ))
+    logger.info(f"👪 Created {len(jobs)} families with {args.children} children each")
+
+    # Workers must not share the parent's pooled connections
+    engine.dispose()
+
+    totals = {}
+    counts = {table.name: 0 for table in ACTIVITY_TABLES}
+    with Pool(args.workers) as pool:
+        results = pool.imap_unordered(run_job, [(job, start_date, end_date) for job in jobs])
+        for done, result in enumerate(results, 1):
+            if engine.dialect.name != "postgresql":
+                with engine.begin() as conn:
+                    for table in ACTIVITY_TABLES:
+                        bulk_insert(conn, table, result["rows"][table.name])
+            for name, rows in result["rows"].items():
+                counts[name] += rows if isinstance(rows, int) else len(rows)
+            totals.update(result["totals"])
+            if done % max(1, len(jobs) // 20) == 0 or done == len(jobs):
+                elapsed = (datetime.utcnow() - started).total_seconds()
+                logger.info(
+                    f"⏱️ {done}/{len(jobs)} families, {counts['task_completions']:,} completions "
+                    f"({counts['task_completions'] / max(elapsed, 0.001):,.0f}/s)"
+                )
+
+    with engine.begin() as conn:
+        finish_profiles(conn, totals)
+    # SQLite: move closed months into their month tables
+    ensure_partitions(engine)
+    # Bulk inserts bypass the write path that maintains rollups
+    with Session(engine) as db:
+        rollups = rebuild_rollups(db, start_date, end_date)
+        db.commit()
+    logger.info(f"📊 Rebuilt {rollups:,} completion rollups")
+
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    logger.info(f"✅ Generated in {elapsed:.1f}s: " + ", ".join(f"{name}={count:,}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.migrations import load_migrations, applied_versions, run_migrations
+from app.core.partitions import ensure_partitions
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Apply pending schema migrations (or list them with --status)"""
+    if "--status" in sys.argv:
+        done = applied_versions(engine)
+        for module in load_migrations():
+            mark = "✅" if module.VERSION in done else "⏳"
+            logger.info(f"{mark} {module.VERSION:04d} {module.DESCRIPTION}")
+        return
+
+    try:
+        applied = run_migrations(engine)
+        if not applied:
+            logger.info("✅ Database schema is up to date")
+        ensure_partitions(engine)
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
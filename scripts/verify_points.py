@@ -0,0 +1,78 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select, func, delete
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.profile import Profile
+from app.models.points_ledger import PointsLedgerEntry
+from app.models.points_snapshot import PointsSnapshot
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def rebuild_snapshots(db, child_id: int) -> int:
+    """Replay a child's ledger and rewrite its snapshots; returns the final balance"""
+    db.execute(delete(PointsSnapshot).filter(PointsSnapshot.child_id == child_id))
+
+    entries = db.execute(select(
+        PointsLedgerEntry.id,
+        PointsLedgerEntry.delta,
+        PointsLedgerEntry.occurred_at
+    ).filter(
+        PointsLedgerEntry.child_id == child_id
+    ).order_by(PointsLedgerEntry.id))
+
+    balance = 0
+    since_snapshot = 0
+    last_at = None
+    for entry_id, delta, occurred_at in entries:
+        balance += delta
+        since_snapshot += 1
+        last_at = max(last_at, occurred_at) if last_at else occurred_at
+        if since_snapshot >= settings.POINTS_SNAPSHOT_INTERVAL:
+            db.add(PointsSnapshot(child_id=child_id, ledger_id=entry_id, balance=balance, as_of=last_at))
+            since_snapshot = 0
+    return balance
+
+
+def main():
+    """Check every ledger balance against total_lifetime_points (--rebuild-snapshots to rewrite snapshots)"""
+    rebuild = "--rebuild-snapshots" in sys.argv
+    db = SessionLocal()
+    mismatches = 0
+
+    try:
+        ledger_sums = dict(db.execute(select(
+            PointsLedgerEntry.child_id,
+            func.sum(PointsLedgerEntry.delta)
+        ).group_by(PointsLedgerEntry.child_id)).all())
+
+        profiles = db.execute(select(Profile.id, Profile.first_name, Profile.total_lifetime_points)).all()
+        for child_id, name, total_points in profiles:
+            balance = rebuild_snapshots(db, child_id) if rebuild else ledger_sums.get(child_id, 0)
+            if balance != total_points:
+                mismatches += 1
+                logger.warning(f"⚠️ {name} (id={child_id}): ledger {balance} != total_lifetime_points {total_points}")
+
+        if rebuild:
+            db.commit()
+            logger.info("✅ Snapshots rebuilt")
+    finally:
+        db.close()
+
+    if mismatches:
+        logger.error(f"❌ {mismatches} balance(s) differ from the ledger")
+        sys.exit(1)
+    logger.info("✅ All balances match the ledger")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Test setup: a throwaway SQLite database and the in-app caches disabled
+
+Settings are read when app modules are imported, so the environment is set
+here before anything from the app is loaded.
+"""
+import os
+import sys
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="task-tracker-tests-")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}",
+    "SECRET_KEY": "test-secret-key",
+    "DEBUG": "false",
+    "SLOW_QUERY_THRESHOLD_MS": "0",
+    "ARCHIVE_DIR": os.path.join(_TMP_DIR, "archive"),
+    "TEMPLATE_CACHE_DIR": os.path.join(_TMP_DIR, "templates"),
+    "CACHE_DIR": os.path.join(_TMP_DIR, "cache"),
+    # Cache hits would hide the query counts of the uncached path
+    "PROFILE_CACHE_SIZE": "0",
+    "TOKEN_CACHE_SIZE": "0",
+    "RESPONSE_CACHE_SIZE": "0",
+    "ANALYTICS_CACHE_SIZE": "0",
+})
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The deployed app (with the analytics router), started against the test database"""
+    import main
+    from app.api import analytics
+
+    if not any(getattr(route, "path", "").startswith("/api/analytics") for route in main.app.routes):
+        main.app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,80 @@
+"""
+Analytics endpoints issue a fixed number of queries, whatever the family size
+or completion volume (a regression here is usually a per-row lazy load)
+"""
+from datetime import date, datetime, timedelta
+import itertools
+
+import pytest
+
+from app.core.rollups import rebuild_rollups
+from app.core.security import create_access_token
+from app.models import Family, Profile, Task, TaskCompletion
+from app.models.profile import UserRole
+from app.models.task import TaskCategory, TaskPeriod
+
+_ids = itertools.count(1)
+
+
+def seed_family(db, children: int, days: int, completions_per_day: int) -> int:
+    """A family with a parent, `children` children and completions up to today; returns the parent id"""
+    n = next(_ids)
+    family = Family(name=f"Family {n}", join_code=f"TEST{n:06d}")
+    db.add(family)
+    db.flush()
+
+    parent = Profile(
+        family_id=family.id, email=f"parent{n}@example.test", password_hash="x",
+        first_name="Parent", last_name=f"Family {n}", role=UserRole.PARENT
+    )
+    kids = [
+        Profile(
+            family_id=family.id, email=f"child{n}-{i}@example.test", password_hash="x",
+            first_name=f"Kid {i}", last_name=f"Family {n}", role=UserRole.CHILD
+        )
+        for i in range(children)
+    ]
+    tasks = [
+        Task(family_id=family.id, title=f"{period.value} {category.value}", points=10, period=period, category=category)
+        for period, category in [(TaskPeriod.MORNING, TaskCategory.DAILY), (TaskPeriod.EVENING, TaskCategory.BONUS)]
+    ]
+    db.add_all([parent, *kids, *tasks])
+    db.flush()
+
+    today = date.today()
+    for kid in kids:
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            for i in range(completions_per_day):
+                task = tasks[i % len(tasks)]
+                db.add(TaskCompletion(
+                    child_id=kid.id, task_id=task.id, family_id=family.id, task_title=task.title,
+                    task_category=task.category.value, task_period=task.period.value,
+                    points_earned=task.points, completed_at=datetime.combine(day, datetime.min.time()),
+                    completion_date=day
+                ))
+    db.flush()
+    # The rows above bypass the write path that maintains rollups
+    rebuild_rollups(db)
+    db.commit()
+    return parent.id
+
+
+def query_count(client, parent_id: int, path: str) -> int:
+    client.cookies.set("access_token", create_access_token(data={"sub": parent_id}))
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-Query-Count"])
+
+
+@pytest.mark.parametrize("path", [
+    "/api/analytics/family?period=week",
+    "/api/analytics/family?period=year",
+    "/api/analytics/family?period=all",
+    "/api/analytics/trends?days=30",
+])
+def test_family_analytics_query_count_is_constant(client, db, path):
+    small = seed_family(db, children=1, days=3, completions_per_day=1)
+    large = seed_family(db, children=5, days=60, completions_per_day=6)
+
+    assert query_count(client, small, path) == query_count(client, large, path)